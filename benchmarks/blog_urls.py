@@ -0,0 +1,183 @@
+"""Сквозной бенчмарк всех адресов blog и pages на наборах разного размера.
+
+Запуск из корня проекта:
+
+    python benchmarks/blog_urls.py --sizes 1000 100000 --repeat 20
+
+База создаётся заново как тестовая (для SQLite — в памяти) и по очереди
+наполняется командой generate_blog_data до каждого размера, после чего
+каждый маршрут из `blog/urls.py` и `pages/urls.py` запрашивается
+тестовым клиентом от имени анонима, автора и другого пользователя.
+Результат — JSON с медианой и 95-м перцентилем времени ответа и числом
+SQL-запросов.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'blogicum'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.cache import cache  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import (CaptureQueriesContext,  # noqa: E402
+                               setup_test_environment)
+from django.urls import URLPattern, URLResolver, reverse  # noqa: E402
+
+from blog import urls as blog_urls  # noqa: E402
+from blog.constants import POST_COUNT  # noqa: E402
+from blog.models import Comment, Post, User  # noqa: E402
+from blog.paginators import CursorPaginator  # noqa: E402
+from pages import urls as pages_urls  # noqa: E402
+
+SIZES = (1_000, 100_000, 1_000_000)
+ROLES = ('anonymous', 'author', 'other')
+
+
+def iter_routes(patterns, namespace):
+    """Пары (имя маршрута, шаблон) с раскрытием include()."""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_routes(pattern.url_patterns, namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield f'{namespace}:{pattern.name}', pattern
+
+
+def seed(total_posts, seed_value):
+    """Дополнить базу до total_posts публикаций командой generate_blog_data.
+
+    Пользователи, категории, местоположения и комментарии добавляются
+    пропорционально числу новых публикаций.
+    """
+    new_posts = total_posts - Post.objects.count()
+    if new_posts <= 0:
+        return
+    call_command(
+        'generate_blog_data', posts=new_posts,
+        categories=max(5, new_posts // 1000), seed=seed_value,
+        stdout=open(os.devnull, 'w')
+    )
+    cache.clear()
+
+
+def pick_objects():
+    """Видимая публикация, комментарий её автора и другой пользователь."""
+    post = Post.objects.select_related('author', 'category').filter(
+        is_visible=True
+    ).order_by('pk').first()
+    comment = Comment.objects.filter(
+        publication=post, author=post.author
+    ).first() or Comment.objects.create(
+        text='Комментарий автора', publication=post, author=post.author
+    )
+    other = User.objects.exclude(pk=post.author_id).order_by('pk').first()
+    return post, comment, other
+
+
+def build_urls(post, comment):
+    kwargs = {
+        'post_id': post.pk,
+        'comment_id': comment.pk,
+        'username': post.author.username,
+        'category_slug': post.category.slug,
+    }
+    routes = [*iter_routes(blog_urls.urlpatterns, 'blog'),
+              *iter_routes(pages_urls.urlpatterns, 'pages')]
+    urls = {
+        name: reverse(name, kwargs={
+            key: kwargs[key] for key in pattern.pattern.converters
+        })
+        for name, pattern in routes
+    }
+    cursor = CursorPaginator(
+        Comment.objects.all(), 1, ordering=('created_at', 'pk')
+    ).encode_cursor(comment)
+    urls['blog:comments'] += f'?after={cursor}'
+    urls['blog:search'] += f'?q={post.text.split()[0]}'
+    last_page = max(1, Post.filtered.count() // POST_COUNT)
+    urls['blog:index (deep page)'] = (
+        f"{reverse('blog:index')}?page={last_page}"
+    )
+    return urls
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def measure(client, url, repeat):
+    client.get(url)
+    timings = []
+    queries = []
+    status = None
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(len(ctx.captured_queries))
+        status = response.status_code
+    return {
+        'status': status,
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'queries': statistics.median(queries),
+    }
+
+
+def run(sizes, repeat, seed_value):
+    results = []
+    for size in sizes:
+        started = time.perf_counter()
+        seed(size, seed_value + size)
+        seed_seconds = round(time.perf_counter() - started, 1)
+        post, comment, other = pick_objects()
+        clients = {
+            role: Client(raise_request_exception=False) for role in ROLES
+        }
+        clients['author'].force_login(post.author)
+        clients['other'].force_login(other)
+        for name, url in build_urls(post, comment).items():
+            for role, client in clients.items():
+                results.append({
+                    'posts': size,
+                    'seed_s': seed_seconds,
+                    'view': name,
+                    'role': role,
+                    **measure(client, url, repeat),
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Файл для JSON вместо stdout.')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    with override_settings(DEBUG=False):
+        results = run(sorted(args.sizes), args.repeat, args.seed)
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Бенчмарк отрисовки пагинатора при разном числе страниц.
+
+Запуск из корня проекта:
+
+    python benchmarks/paginator_render.py
+
+Время отрисовки `includes/paginator.html` не должно зависеть от числа
+страниц: шаблон получает сокращённый список номеров из view-слоя.
+"""
+import json
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'blogicum'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.paginator import Paginator  # noqa: E402
+from django.template.loader import get_template  # noqa: E402
+
+from blog.paginators import get_page_range  # noqa: E402
+
+PAGE_COUNTS = (10, 1_000, 20_000, 1_000_000)
+REPEAT = 200
+
+
+def bench(num_pages):
+    template = get_template('includes/paginator.html')
+    paginator = Paginator(range(num_pages * 10), 10)
+    page = paginator.page(num_pages // 2 or 1)
+
+    def render():
+        return template.render(
+            {'page_obj': page, 'page_range': get_page_range(page)}
+        )
+
+    html = render()
+    seconds = min(timeit.repeat(render, number=REPEAT, repeat=3)) / REPEAT
+    return {
+        'pages': num_pages,
+        'render_us': round(seconds * 1_000_000, 1),
+        'links': html.count('<li'),
+        'bytes': len(html),
+    }
+
+
+if __name__ == '__main__':
+    print(json.dumps([bench(num_pages) for num_pages in PAGE_COUNTS],
+                     indent=2))
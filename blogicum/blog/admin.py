@@ -1,10 +1,14 @@
 from django.contrib import admin
 
+from blog.admin_filters import FacetFieldListFilter
+from blog.admin_mixins import (AutocompleteMediaMixin, EstimatedCountMixin,
+                               IndexedSearchMixin,
+                               ListEditableAutocompleteMixin)
 from blog.models import Category, Comment, Location, Post
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = (
         'title',
         'slug',
@@ -19,9 +23,13 @@ class CategoryAdmin(admin.ModelAdmin):
     list_filter = (
         'is_published',)
 
+    search_fields = ('^title',)
+
+    ordering = ('title',)
+
 
 @admin.register(Location)
-class LocationAdmin(admin.ModelAdmin):
+class LocationAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = (
         'name',
         'is_published',
@@ -35,9 +43,15 @@ class LocationAdmin(admin.ModelAdmin):
     list_filter = (
         'is_published',)
 
+    search_fields = ('^name',)
+
+    ordering = ('name',)
+
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(EstimatedCountMixin, AutocompleteMediaMixin,
+                ListEditableAutocompleteMixin, IndexedSearchMixin,
+                admin.ModelAdmin):
     list_display = (
         'title',
         'pub_date',
@@ -45,6 +59,8 @@ class PostAdmin(admin.ModelAdmin):
         'location',
         'category',
         'is_published',
+        'is_visible',
+        'comment_count',
         'created_at'
     )
 
@@ -55,12 +71,34 @@ class PostAdmin(admin.ModelAdmin):
         'category'
     )
 
+    autocomplete_fields = (
+        'author',
+        'location',
+        'category'
+    )
+
+    list_select_related = (
+        'author',
+        'location',
+        'category'
+    )
+
     search_fields = ('title',
                      'author__username',
                      'location__name',
                      'category__title')
 
-    list_filter = ('author',
+    search_modes = {
+        'title': 'fts',
+        'author__username': 'prefix',
+        'location__name': 'prefix',
+        'category__title': 'prefix',
+    }
+
+    search_help_text = ('Слова заголовка или начало имени автора, '
+                        'местоположения, категории.')
+
+    list_filter = (('author', FacetFieldListFilter),
                    'location',
                    'category',
                    'is_published')
@@ -69,7 +107,8 @@ class PostAdmin(admin.ModelAdmin):
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(EstimatedCountMixin, AutocompleteMediaMixin,
+                   IndexedSearchMixin, admin.ModelAdmin):
     list_display = (
         'author',
         'text',
@@ -82,8 +121,13 @@ class CommentAdmin(admin.ModelAdmin):
         'text',
     )
 
+    list_select_related = (
+        'author',
+        'publication'
+    )
+
     list_filter = (
-        'publication',
+        ('publication', FacetFieldListFilter),
     )
 
     search_fields = (
@@ -91,6 +135,13 @@ class CommentAdmin(admin.ModelAdmin):
         'publication__title'
     )
 
+    search_modes = {
+        'author__username': 'prefix',
+        'publication__title': 'fts',
+    }
+
+    search_help_text = 'Начало имени автора или слова заголовка публикации.'
+
     list_display_links = ('author', )
 
 
@@ -0,0 +1,108 @@
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Count
+
+from blog.admin_mixins import CachedAutocompleteSelect
+from blog.cache import make_key, model_generations
+from blog.constants import COUNT_CACHE_TIMEOUT, FACET_LIMIT
+from core.metrics import record_cache
+
+
+class FacetFieldListFilter(admin.RelatedFieldListFilter):
+    """Фильтр по внешнему ключу с самыми частыми значениями и поиском.
+
+    Вместо всех строк связанной таблицы показывает FACET_LIMIT значений,
+    которые чаще всего встречаются в списке, с числом строк. Счётчики
+    считаются одним GROUP BY по всей таблице, без учёта других фильтров,
+    и живут в кеше COUNT_CACHE_TIMEOUT секунд. Остальные значения
+    находятся полем автодополнения под списком.
+    """
+
+    template = 'admin/facet_filter.html'
+    facet_limit = FACET_LIMIT
+
+    def __init__(self, field, request, params, model, model_admin,
+                 field_path):
+        super().__init__(field, request, params, model, model_admin,
+                         field_path)
+        # Очищенное поле поиска отправляет пустое значение: это «Все».
+        # Параметр уже забран из params родителем, как у всех фильтров
+        # Django, поэтому убирать его нужно из своих used_parameters.
+        if self.lookup_val == '':
+            self.lookup_val = None
+            del self.used_parameters[self.lookup_kwarg]
+
+    def get_facets(self):
+        """Список (значение, подпись, число строк) самых частых значений."""
+        key = make_key(
+            'facets',
+            (self.field.model._meta.label, self.field_path, self.facet_limit),
+            model_generations(self.field.model, self.field.related_model)
+        )
+        facets = cache.get(key)
+        record_cache('admin_facets', facets is not None)
+        if facets is None:
+            rows = (
+                self.field.model._default_manager
+                .exclude(**{f'{self.field_path}__isnull': True})
+                .values_list(self.field_path)
+                .annotate(count=Count('pk'))
+                .order_by('-count')[:self.facet_limit]
+            )
+            rows = list(rows)
+            related = self.field.related_model._base_manager.in_bulk(
+                [pk for pk, count in rows]
+            )
+            facets = [
+                (pk, str(related[pk]), count)
+                for pk, count in rows if pk in related
+            ]
+            cache.set(key, facets, COUNT_CACHE_TIMEOUT)
+        return facets
+
+    def get_selected(self, facets):
+        """Пара (значение, подпись) выбранного значения или None."""
+        if self.lookup_val is None:
+            return None
+        for pk, label, count in facets:
+            if str(pk) == self.lookup_val:
+                return pk, label
+        try:
+            obj = self.field.related_model._base_manager.filter(
+                pk=self.lookup_val
+            ).first()
+        except (ValueError, ValidationError):
+            return None
+        return None if obj is None else (obj.pk, str(obj))
+
+    def field_choices(self, field, request, model_admin):
+        self.admin_site = model_admin.admin_site
+        facets = self.get_facets()
+        choices = [(pk, f'{label} ({count})') for pk, label, count in facets]
+        self.selected = self.get_selected(facets)
+        if self.selected is not None and self.selected[0] not in {
+            pk for pk, label, count in facets
+        }:
+            choices.append(self.selected)
+        return choices
+
+    def get_search_widget(self):
+        widget = CachedAutocompleteSelect(
+            self.field, self.admin_site, attrs={'data-width': '100%'}
+        )
+        widget.selected = self.selected
+        form_field = self.field.formfield(widget=widget, required=False)
+        return form_field.widget.render(
+            self.lookup_kwarg, self.lookup_val,
+            attrs={'id': f'facet_{self.field_path}'}
+        )
+
+    def choices(self, changelist):
+        expected = self.expected_parameters()
+        self.hidden_params = [
+            (name, value) for name, value in changelist.params.items()
+            if name not in expected
+        ]
+        self.search_widget = self.get_search_widget()
+        yield from super().choices(changelist)
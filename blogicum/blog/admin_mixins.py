@@ -0,0 +1,292 @@
+from django.contrib.admin.utils import lookup_spawns_duplicates
+from django.contrib.admin.views.autocomplete import AutocompleteJsonView
+from django.contrib.admin.views.main import PAGE_VAR
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured, PermissionDenied
+from django.db.models import F, Q
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.functions import Lower
+from django.db.models.lookups import GreaterThanOrEqual, LessThan
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils.text import smart_split, unescape_string_literal
+
+from blog.cache import make_key, model_generations
+from blog.constants import ADMIN_COUNT_LIMIT, LOOKUP_CACHE_TIMEOUT
+from blog.models import Post
+from blog.paginators import CachedCountPaginator, EstimatedCountPaginator
+from blog.search import matching_ids
+from core.metrics import record_cache
+
+# Верхняя граница диапазона для поиска по началу строки: больше любого
+# символа, который может идти после префикса.
+PREFIX_UPPER_BOUND = '\U0010ffff'
+# Режимы для полей search_fields с префиксами Django.
+PREFIX_MODES = {'^': 'prefix', '=': 'exact', '@': 'fts'}
+# Параметр списка в админке, который просит посчитать записи точно.
+EXACT_COUNT_VAR = '_exact_count'
+
+
+def prefix_range(expression, prefix):
+    """Условие «expression начинается с prefix» в виде диапазона."""
+    return Q(
+        GreaterThanOrEqual(expression, prefix),
+        LessThan(expression, prefix + PREFIX_UPPER_BOUND),
+    )
+
+
+class IndexedSearchMixin:
+    """Поиск в админке, который опирается на индексы, а не на LIKE '%x%'.
+
+    Режим поля задаётся словарём search_modes {поле: режим} или
+    префиксом в search_fields (^ — prefix, = — exact, @ — fts):
+
+    * contains — icontains, как в Django по умолчанию;
+    * exact — точное совпадение;
+    * prefix — начало строки без учёта регистра: диапазон по индексу
+      на Lower(поле);
+    * fts — начала всех слов по полнотекстовому индексу публикаций
+      (только title и text модели Post).
+
+    Условие на поле связанной модели превращается в подзапрос по её
+    таблице: author__username ищется как author_id IN (...), и каждая
+    ветка OR использует свой индекс.
+    """
+
+    search_modes = {}
+
+    def get_search_mode(self, field):
+        if field[:1] in PREFIX_MODES:
+            return field[1:], PREFIX_MODES[field[0]]
+        return field, self.search_modes.get(field, 'contains')
+
+    def match_condition(self, model, name, mode, bit):
+        """Условие Q для поля name модели model."""
+        if mode == 'contains':
+            return Q(**{f'{name}__icontains': bit})
+        if mode == 'exact':
+            return Q(**{name: bit})
+        if mode == 'prefix':
+            condition = prefix_range(Lower(name), bit.lower())
+            if not bit.isascii():
+                # LOWER в SQLite меняет регистр только латиницы, поэтому
+                # для других алфавитов проверяются и обычные написания
+                # по индексу самого поля.
+                for variant in {bit, bit.capitalize(), bit.upper()}:
+                    condition |= prefix_range(F(name), variant)
+            return condition
+        if mode == 'fts':
+            if model is not Post:
+                raise ImproperlyConfigured(
+                    f'Режим fts доступен только для полей Post, а не {model}.'
+                )
+            ids = matching_ids(name, bit)
+            if ids is None:
+                return Q(**{f'{name}__icontains': bit})
+            return Q(pk__in=ids)
+        raise ImproperlyConfigured(f'Неизвестный режим поиска: {mode}.')
+
+    def field_condition(self, path, mode, bit):
+        *relations, name = path.split(LOOKUP_SEP)
+        if mode == 'contains':
+            return Q(**{f'{path}__icontains': bit})
+        model = self.model
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        condition = self.match_condition(model, name, mode, bit)
+        if not relations:
+            return condition
+        return Q(**{
+            f'{LOOKUP_SEP.join(relations)}__in':
+                model._base_manager.filter(condition).values('pk')
+        })
+
+    def get_search_results(self, request, queryset, search_term):
+        search_fields = self.get_search_fields(request)
+        if not search_fields or not search_term:
+            return queryset, False
+        fields = [self.get_search_mode(field) for field in search_fields]
+        for bit in smart_split(search_term):
+            if bit.startswith(('"', "'")) and bit[0] == bit[-1]:
+                bit = unescape_string_literal(bit)
+            condition = Q()
+            for path, mode in fields:
+                condition |= self.field_condition(path, mode, bit)
+            queryset = queryset.filter(condition)
+        may_have_duplicates = any(
+            lookup_spawns_duplicates(self.opts, path)
+            for path, mode in fields if mode == 'contains'
+        )
+        return queryset, may_have_duplicates
+
+
+class CachedAutocompleteJsonView(AutocompleteJsonView):
+    """Эндпоинт автодополнения с кешем страниц ответа.
+
+    Права проверяются до обращения к кешу. Ответ живёт
+    LOOKUP_CACHE_TIMEOUT секунд и сбрасывается сменой поколения;
+    число результатов считается один раз на запрос поиска.
+    """
+
+    def get_signature(self):
+        return (self.source_field.model._meta.label, self.source_field.name,
+                self.term)
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True, **kwargs):
+        return CachedCountPaginator(
+            queryset, per_page, signature=('lookup', *self.get_signature()),
+            generations=model_generations(queryset.model), orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page
+        )
+
+    def get(self, request, *args, **kwargs):
+        (
+            self.term,
+            self.model_admin,
+            self.source_field,
+            to_field_name,
+        ) = self.process_request(request)
+        if not self.has_perm(request):
+            raise PermissionDenied
+        key = make_key(
+            'lookup', (*self.get_signature(), request.GET.get('page', '1')),
+            model_generations(self.model_admin.model)
+        )
+        data = cache.get(key)
+        record_cache('admin_lookup', data is not None)
+        if data is None:
+            self.object_list = self.get_queryset()
+            context = self.get_context_data()
+            data = {
+                'results': [
+                    self.serialize_result(obj, to_field_name)
+                    for obj in context['object_list']
+                ],
+                'pagination': {'more': context['page_obj'].has_next()},
+            }
+            cache.set(key, data, LOOKUP_CACHE_TIMEOUT)
+        return JsonResponse(data)
+
+
+class CachedAutocompleteSelect(AutocompleteSelect):
+    """Виджет автодополнения, который не ищет выбранный объект в базе.
+
+    Подпись выбранного значения берётся из selected — пары (значение,
+    подпись), которую заполняет ListEditableAutocompleteMixin по уже
+    загруженной строке списка.
+    """
+
+    selected = None
+
+    def get_url(self):
+        return reverse('admin_lookup')
+
+    def optgroups(self, name, value, attr=None):
+        if self.selected is None or [str(self.selected[0])] != value:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        options.append(self.create_option(
+            name, self.selected[0], self.selected[1], True, len(options)
+        ))
+        return [(None, options, 0)]
+
+
+class ListEditableAutocompleteMixin:
+    """Автодополнение вместо <select> для внешних ключей в списке.
+
+    Поля из autocomplete_fields выводятся виджетом
+    CachedAutocompleteSelect, который получает варианты с кешируемого
+    эндпоинта, а подпись текущего значения — из объекта строки. Связи
+    строк стоит загрузить через list_select_related.
+    """
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.get_autocomplete_fields(request):
+            kwargs.setdefault('widget', CachedAutocompleteSelect(
+                db_field, self.admin_site, using=kwargs.get('using')
+            ))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_formset(self, request, **kwargs):
+        formset = super().get_changelist_formset(request, **kwargs)
+        names = [
+            name for name in self.get_autocomplete_fields(request)
+            if name in self.list_editable
+        ]
+
+        class AutocompleteFormSet(formset):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                for form in self.forms:
+                    for name in names:
+                        related = getattr(form.instance, name)
+                        if related is None:
+                            continue
+                        field = form.fields[name]
+                        # Django оборачивает виджет связи в
+                        # RelatedFieldWidgetWrapper.
+                        widget = getattr(field.widget, 'widget', field.widget)
+                        widget.selected = (
+                            related.pk, field.label_from_instance(related)
+                        )
+
+        return AutocompleteFormSet
+
+
+class AutocompleteMediaMixin:
+    """Подключить к странице списка скрипты автодополнения.
+
+    Они нужны полю поиска FacetFieldListFilter, даже если в формах
+    списка автодополнения нет.
+    """
+
+    @property
+    def media(self):
+        return super().media + CachedAutocompleteSelect(
+            None, self.admin_site
+        ).media
+
+
+class EstimatedCountMixin:
+    """Список в админке без точного COUNT(*) на каждой загрузке.
+
+    Общее число записей без фильтров не считается
+    (show_full_result_count), а число отфильтрованных даёт
+    EstimatedCountPaginator. Если оно оценено снизу, под списком
+    выводится ссылка с параметром EXACT_COUNT_VAR: по ней записи
+    считаются точно, и результат попадает в кеш.
+    """
+
+    show_full_result_count = False
+    count_limit = ADMIN_COUNT_LIMIT
+
+    def changelist_view(self, request, extra_context=None):
+        request.exact_count = EXACT_COUNT_VAR in request.GET
+        if request.exact_count:
+            request.GET = request.GET.copy()
+            del request.GET[EXACT_COUNT_VAR]
+        return super().changelist_view(request, extra_context)
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        try:
+            page_number = max(int(request.GET.get(PAGE_VAR, 1)), 1)
+        except ValueError:
+            page_number = 1
+        return EstimatedCountPaginator(
+            queryset, per_page, page_number=page_number,
+            exact=getattr(request, 'exact_count', False),
+            limit=self.count_limit, orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page
+        )
+
+    def get_changelist_instance(self, request):
+        changelist = super().get_changelist_instance(request)
+        changelist.exact_count_url = changelist.get_query_string(
+            {EXACT_COUNT_VAR: 1, PAGE_VAR: changelist.page_num}
+        )
+        return changelist
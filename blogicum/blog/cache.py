@@ -0,0 +1,73 @@
+import datetime
+import time
+
+from django.core.cache import cache
+
+GENERATION_KEY = 'blog:{}:generation'
+# Поколения групп данных: публикации с категориями, комментарии и
+# пользователи. Ключ выборки включает поколения всех групп, от которых
+# она зависит, поэтому новый комментарий не сбрасывает счётчики лент.
+POSTS = 'posts'
+COMMENTS = 'comments'
+USERS = 'users'
+GENERATIONS = (POSTS, COMMENTS, USERS)
+MODEL_GENERATIONS = {
+    'blog.Comment': (POSTS, COMMENTS),
+    'auth.User': (USERS,),
+}
+
+
+def get_generations(names=(POSTS,)):
+    """Текущие поколения групп данных names.
+
+    Поколение входит в ключи кешированных выборок: увеличение поколения
+    разом делает устаревшими все такие ключи. Начальное значение
+    берётся от времени, чтобы после вытеснения ключа поколения не ожили
+    записи, сохранённые в прошлых поколениях.
+    """
+    keys = [GENERATION_KEY.format(name) for name in names]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, int(time.time() * 1000), timeout=None)
+            found[key] = cache.get(key) or int(time.time() * 1000)
+    return [found[key] for key in keys]
+
+
+def bump_generation(*names):
+    """Сбросить выборки, зависящие от групп names, по умолчанию — все."""
+    for name in names or GENERATIONS:
+        key = GENERATION_KEY.format(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, int(time.time() * 1000), timeout=None)
+
+
+def model_generations(*models):
+    """Группы данных, от которых зависят выборки моделей models."""
+    return tuple(dict.fromkeys(
+        name for model in models
+        for name in MODEL_GENERATIONS.get(model._meta.label, (POSTS,))
+    ))
+
+
+def make_key(prefix, signature, generations=(POSTS,)):
+    """Ключ кеша для выборки с сигнатурой signature.
+
+    generations — группы данных, изменение которых сбрасывает ключ.
+    """
+    parts = ':'.join(str(part) for part in signature)
+    current = '-'.join(str(value) for value in get_generations(generations))
+    return f'blog:{prefix}:{current}:{parts}'
+
+
+def time_bucket(now, granularity):
+    """Границы интервала длиной granularity секунд, содержащего now.
+
+    Время внутри интервала считается одинаковым, поэтому выборки,
+    построенные в одном интервале, можно отдавать из кеша.
+    """
+    start = now.timestamp() // granularity * granularity
+    start = datetime.datetime.fromtimestamp(start, tz=now.tzinfo)
+    return start, start + datetime.timedelta(seconds=granularity)
@@ -1,4 +1,16 @@
 """Файл констант."""
 
 POST_COUNT = 10
+COMMENT_COUNT = 50
 TITLE_SLICE = 30
+COUNT_CACHE_TIMEOUT = 60 * 5
+PAGE_RANGE_ON_EACH_SIDE = 2
+PAGE_RANGE_ON_ENDS = 1
+EXCERPT_WORDS = 10
+WORDS_PER_MINUTE = 200
+TEXT_RENDERER_VERSION = 1
+EXPORT_CHUNK_SIZE = 2000
+SEARCH_SNIPPET_TOKENS = 24
+LOOKUP_CACHE_TIMEOUT = 60
+FACET_LIMIT = 10
+ADMIN_COUNT_LIMIT = 10000
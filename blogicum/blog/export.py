@@ -0,0 +1,69 @@
+"""Потоковая выгрузка опубликованных публикаций для аналитики.
+
+Строки читаются из базы через iterator() кусками по chunk_size и сразу
+превращаются в текст, поэтому расход памяти не зависит от размера
+таблицы.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from blog.constants import EXPORT_CHUNK_SIZE
+from blog.managers import published_filter
+from blog.models import Post
+
+EXPORT_FORMATS = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+# Колонка выгрузки и путь к значению в запросе.
+EXPORT_COLUMNS = (
+    ('id', 'pk'),
+    ('title', 'title'),
+    ('text', 'text'),
+    ('pub_date', 'pub_date'),
+    ('created_at', 'created_at'),
+    ('author', 'author__username'),
+    ('category', 'category__slug'),
+    ('category_title', 'category__title'),
+    ('location', 'location__name'),
+    ('comment_count', 'comment_count'),
+)
+
+
+def export_rows(chunk_size=EXPORT_CHUNK_SIZE):
+    """Кортежи значений EXPORT_COLUMNS по возрастанию id."""
+    return Post.objects.filter(published_filter()).order_by('pk').values_list(
+        *(lookup for _, lookup in EXPORT_COLUMNS)
+    ).iterator(chunk_size=chunk_size)
+
+
+class Echo:
+    """Файлоподобный объект, который возвращает записанное."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_jsonl(rows):
+    names = [name for name, _ in EXPORT_COLUMNS]
+    for row in rows:
+        yield json.dumps(
+            dict(zip(names, row)), cls=DjangoJSONEncoder, ensure_ascii=False
+        ) + '\n'
+
+
+def iter_export(export_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """Строки выгрузки в формате export_format из EXPORT_FORMATS."""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f'Неизвестный формат выгрузки: {export_format}')
+    render = iter_csv if export_format == 'csv' else iter_jsonl
+    return render(export_rows(chunk_size))
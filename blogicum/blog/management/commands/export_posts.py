@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.constants import EXPORT_CHUNK_SIZE
+from blog.export import EXPORT_FORMATS, iter_export
+
+
+class Command(BaseCommand):
+    help = ('Выгружает опубликованные публикации с автором, категорией, '
+            'местоположением и числом комментариев в JSONL или CSV.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=EXPORT_FORMATS, default='jsonl'
+        )
+        parser.add_argument(
+            '--output', '-o',
+            help='Файл для выгрузки; по умолчанию — stdout.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+            help='Сколько строк читать из базы за раз.'
+        )
+
+    def handle(self, *args, **options):
+        lines = iter_export(options['format'], options['chunk_size'])
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        try:
+            with open(options['output'], 'w', encoding='utf-8',
+                      newline='') as output:
+                output.writelines(lines)
+        except OSError as error:
+            raise CommandError(error)
@@ -0,0 +1,321 @@
+import itertools
+import random
+from datetime import timedelta
+from functools import partial
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from blog.cache import bump_generation
+from blog.models import Category, Comment, Location, Post, User
+from blog.search import index_posts
+from core.db import bulk_load
+
+TEXT_VARIANTS = 200
+# Типы полей, значения которых нужно готовить для БД.
+ADAPTED_TYPES = frozenset({
+    'BinaryField', 'DateField', 'DateTimeField', 'DecimalField',
+    'DurationField', 'JSONField', 'TimeField', 'UUIDField',
+})
+WORDS = (
+    'блог', 'путешествие', 'город', 'утро', 'кофе', 'горы', 'море', 'книга',
+    'проект', 'код', 'вечер', 'друзья', 'музыка', 'поезд', 'снег', 'лето',
+    'заметка', 'история', 'фотография', 'дорога', 'мысль', 'работа', 'дом',
+)
+
+
+def zipf_weights(size, exponent=1.1):
+    """Накопленные веса рангового распределения: первые — самые частые."""
+    return list(itertools.accumulate(
+        1 / rank ** exponent for rank in range(1, size + 1)
+    ))
+
+
+class Command(BaseCommand):
+    help = ('Генерирует синтетические публикации, комментарии, категории, '
+            'местоположения и пользователей для нагрузочных проверок.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument(
+            '--users', type=int,
+            help='По умолчанию — одна двадцатая от числа публикаций.'
+        )
+        parser.add_argument(
+            '--categories', type=int,
+            help='По умолчанию — одна тысячная от числа публикаций.'
+        )
+        parser.add_argument(
+            '--locations', type=int,
+            help='По умолчанию — одна тысячная от числа публикаций.'
+        )
+        parser.add_argument(
+            '--comments-per-post', type=float, default=1,
+            help=('Среднее экспоненциального распределения, из которого '
+                  'берётся число комментариев обычной публикации.')
+        )
+        parser.add_argument(
+            '--hot-share', type=float, default=0.01,
+            help='Доля «горячих» публикаций с в 20 раз большим числом '
+                 'комментариев.'
+        )
+        parser.add_argument(
+            '--deferred-share', type=float, default=0.02,
+            help='Доля отложенных публикаций с датой в будущем.'
+        )
+        parser.add_argument(
+            '--unpublished-share', type=float, default=0.05,
+            help='Доля публикаций, снятых с публикации.'
+        )
+        parser.add_argument(
+            '--unpublished-categories-share', type=float, default=0.1,
+            help='Доля категорий, снятых с публикации.'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        posts = options['posts']
+        started = perf_counter()
+        with transaction.atomic(), bulk_load(Post, Comment):
+            users = self.create_users(options['users'] or max(1, posts // 20))
+            categories = self.create_categories(
+                options['categories'] or max(1, posts // 1000),
+                options['unpublished_categories_share']
+            )
+            locations = self.create_locations(
+                options['locations'] or max(1, posts // 1000)
+            )
+            first_post = self.next_pk(Post)
+            created_posts, comments = self.create_posts(
+                posts, users, categories, locations, options
+            )
+            index_posts(Post.objects.filter(pk__gte=first_post))
+        bump_generation()
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {len(users)}, категорий '
+            f'{len(categories)}, местоположений {len(locations)}, '
+            f'публикаций {created_posts}, комментариев {comments} '
+            f'за {perf_counter() - started:.1f} с'
+        ))
+
+    def next_pk(self, model):
+        return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+    def bulk_create(self, model, objects):
+        """Сохранить объекты пачками; сигналы при этом не отправляются."""
+        objects = iter(objects)
+        while batch := list(itertools.islice(objects, self.batch_size)):
+            model.objects.bulk_create(batch, batch_size=self.batch_size)
+
+    def create_users(self, count):
+        start = self.next_pk(User)
+        users = [
+            User(pk=pk, username=f'user{pk}', password='!')
+            for pk in range(start, start + count)
+        ]
+        self.bulk_create(User, users)
+        return [user.pk for user in users]
+
+    def create_categories(self, count, unpublished_share):
+        start = self.next_pk(Category)
+        categories = [
+            Category(
+                pk=pk, title=f'Категория {pk}', slug=f'category-{pk}',
+                description=f'Публикации категории {pk}.',
+                is_published=self.rng.random() >= unpublished_share,
+            )
+            for pk in range(start, start + count)
+        ]
+        self.bulk_create(Category, categories)
+        return [(category.pk, category.is_published)
+                for category in categories]
+
+    def create_locations(self, count):
+        start = self.next_pk(Location)
+        locations = [
+            Location(pk=pk, name=f'Место {pk}')
+            for pk in range(start, start + count)
+        ]
+        self.bulk_create(Location, locations)
+        return [location.pk for location in locations]
+
+    def make_texts(self, model, max_paragraphs, max_words):
+        """Тексты разной длины с заранее посчитанными производными полями."""
+        texts = []
+        for _ in range(TEXT_VARIANTS):
+            paragraphs = min(max_paragraphs,
+                             int(self.rng.paretovariate(1.5)))
+            obj = model(text='\n'.join(
+                ' '.join(self.rng.choices(
+                    WORDS, k=self.rng.randint(3, max_words)
+                ))
+                for _ in range(paragraphs)
+            ))
+            if model is Post:
+                obj.fill_text_stats()
+            obj.render_text_html()
+            texts.append(obj)
+        return texts
+
+    def comment_count(self, options):
+        count = self.rng.expovariate(1 / options['comments_per_post'])
+        if self.rng.random() < options['hot_share']:
+            count *= 20
+        return int(count)
+
+    def insert_rows(self, model, names, rows, constants=None):
+        """Вставить строки пачками через executemany.
+
+        Строка — кортеж значений полей names (attname). Поля из словаря
+        constants одинаковы во всех строках, остальные поля из
+        concrete_fields модели получают значение по умолчанию; и те и
+        другие готовятся для БД один раз. В строках через
+        get_db_prep_value проходят только поля из ADAPTED_TYPES, например
+        даты: строки, числа и флаги драйвер принимает как есть.
+        Экземпляры и pre_save не создаются, как и в bulk_create, поэтому
+        миллионы строк вставляются быстро.
+        """
+        opts = model._meta
+        # Обёртка соединения берётся один раз: прокси django.db.connection
+        # ищет её заново при каждом обращении.
+        database = connections[DEFAULT_DB_ALIAS]
+        fields = {field.attname: field for field in opts.concrete_fields}
+        constants = {
+            **{name: field.get_default() for name, field in fields.items()
+               if name not in names},
+            **(constants or {}),
+        }
+        unknown = {*names, *constants} - fields.keys()
+        if unknown or len(names) + len(constants) != len(fields):
+            raise ValueError(
+                f'Поля {opts.label} заданы неверно: {sorted(unknown)}.'
+            )
+        fixed = [fields[name] for name in constants]
+        fixed_values = tuple(
+            field.get_db_prep_save(constants[field.attname], database)
+            for field in fixed
+        )
+        # Генератор сам даёт значения нужного типа, поэтому to_python из
+        # get_prep_value пропускается: prepared=True.
+        adapters = [
+            (index, partial(fields[name].get_db_prep_value,
+                            connection=database, prepared=True))
+            for index, name in enumerate(names)
+            if fields[name].get_internal_type() in ADAPTED_TYPES
+        ]
+        columns = ', '.join(
+            database.ops.quote_name(field.column)
+            for field in [*(fields[name] for name in names), *fixed]
+        )
+        placeholders = ', '.join(['%s'] * len(fields))
+        sql = (f'INSERT INTO {database.ops.quote_name(opts.db_table)} '
+               f'({columns}) VALUES ({placeholders})')
+
+        def prepared():
+            for row in rows:
+                row = list(row)
+                for index, adapt in adapters:
+                    row[index] = adapt(row[index])
+                row.extend(fixed_values)
+                yield row
+
+        values = prepared()
+        with database.cursor() as cursor:
+            while batch := list(itertools.islice(values, self.batch_size)):
+                cursor.executemany(sql, batch)
+
+    def create_posts(self, count, users, categories, locations, options):
+        """Публикации и комментарии к ним.
+
+        Авторы и категории выбираются по ранговому распределению, флаг
+        видимости и счётчик комментариев заполняются сразу, поэтому
+        пересчитывать их после вставки не нужно.
+        """
+        rng = self.rng
+        user_weights = zipf_weights(len(users))
+        category_weights = zipf_weights(len(categories))
+        post_text_names = ('text', 'excerpt', 'word_count', 'text_html',
+                           'text_html_version')
+        post_texts = [
+            tuple(getattr(text, name) for name in post_text_names)
+            for text in self.make_texts(Post, 8, 30)
+        ]
+        comment_text_names = ('text', 'text_html', 'text_html_version')
+        comment_texts = [
+            tuple(getattr(text, name) for name in comment_text_names)
+            for text in self.make_texts(Comment, 1, 15)
+        ]
+        now = self.now
+        minutes = [timedelta(minutes=minute) for minute in range(60 * 24)]
+        day_deltas = {
+            days: timedelta(days=days) for days in range(-30, 365 * 3)
+        }
+        # Без местоположения остаётся около 30% публикаций.
+        location_weights = [
+            *itertools.accumulate([0.7 / len(locations)] * len(locations)),
+            1.0
+        ]
+        comments = []
+
+        def posts():
+            authors = rng.choices(users, cum_weights=user_weights, k=count)
+            post_categories = rng.choices(
+                categories, cum_weights=category_weights, k=count
+            )
+            texts = rng.choices(post_texts, k=count)
+            post_locations = rng.choices(
+                [*locations, None], cum_weights=location_weights, k=count
+            )
+            for (pk, author_id, (category_id, category_published), text,
+                 location_id) in zip(
+                    itertools.count(self.next_pk(Post)), authors,
+                    post_categories, texts, post_locations):
+                if rng.random() < options['deferred_share']:
+                    days = -rng.randrange(30)
+                else:
+                    days = rng.randrange(1, 365 * 3)
+                pub_date = now - day_deltas[days] - rng.choice(minutes)
+                is_published = rng.random() >= options['unpublished_share']
+                comment_count = self.comment_count(options)
+                if comment_count:
+                    comments.append((pk, pub_date, comment_count))
+                yield (
+                    pk, f'Публикация {pk}', *text, pub_date, author_id,
+                    category_id, location_id, is_published,
+                    is_published and category_published and pub_date <= now,
+                    comment_count,
+                )
+
+        self.insert_rows(Post, (
+            'id', 'title', *post_text_names, 'pub_date', 'author_id',
+            'category_id', 'location_id', 'is_published', 'is_visible',
+            'comment_count',
+        ), posts(), constants={'created_at': now})
+
+        def post_comments():
+            total = sum(comment_count for *_, comment_count in comments)
+            publications = itertools.chain.from_iterable(
+                itertools.repeat((post_id, pub_date), comment_count)
+                for post_id, pub_date, comment_count in comments
+            )
+            for pk, (post_id, pub_date), author_id, text, delay in zip(
+                itertools.count(self.next_pk(Comment)), publications,
+                rng.choices(users, cum_weights=user_weights, k=total),
+                rng.choices(comment_texts, k=total),
+                rng.choices(minutes, k=total),
+            ):
+                yield (pk, *text, post_id, author_id,
+                       min(now, pub_date + delay))
+
+        self.insert_rows(Comment, (
+            'id', *comment_text_names, 'publication_id', 'author_id',
+            'created_at',
+        ), post_comments())
+        return count, sum(comment_count for *_, comment_count in comments)
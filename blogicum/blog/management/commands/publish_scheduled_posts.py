@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.scheduler import (next_due_date, publish_due_posts,
+                            reconcile_visibility)
+
+
+class Command(BaseCommand):
+    help = ('Открывает отложенные публикации, время которых наступило. '
+            'С --loop работает постоянно, просыпаясь к ближайшей из них.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а ждать следующих отложенных публикаций.'
+        )
+        parser.add_argument(
+            '--max-sleep', type=float, default=60,
+            help=('Наибольшая пауза между проверками в секундах: за это '
+                  'время замечаются новые отложенные публикации.')
+        )
+        parser.add_argument(
+            '--reconcile', action='store_true',
+            help='Сначала пересчитать флаг видимости у всех публикаций.'
+        )
+
+    def publish(self):
+        published = publish_due_posts()
+        if published:
+            self.stdout.write(f'Открыто публикаций: {published}')
+        return published
+
+    def handle(self, *args, **options):
+        if options['reconcile']:
+            shown, hidden = reconcile_visibility()
+            self.stdout.write(
+                f'Флаг видимости исправлен: открыто {shown}, скрыто {hidden}'
+            )
+        published = self.publish()
+        while options['loop']:
+            next_due = next_due_date()
+            pause = options['max_sleep']
+            if next_due is not None:
+                wait = (next_due - timezone.now()).total_seconds()
+                pause = min(pause, max(wait, 0))
+            time.sleep(pause)
+            published += self.publish()
+        self.stdout.write(
+            self.style.SUCCESS(f'Всего открыто публикаций: {published}')
+        )
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики комментариев у всех публикаций.'
+
+    def handle(self, *args, **options):
+        comments = (
+            Comment.objects.filter(publication=OuterRef('pk'))
+            .order_by()
+            .values('publication')
+            .annotate(total=Count('pk'))
+            .values('total')
+        )
+        updated = Post.objects.update(
+            comment_count=Coalesce(Subquery(comments), 0)
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано публикаций: {updated}')
+        )
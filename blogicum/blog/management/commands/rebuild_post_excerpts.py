@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает анонсы и количество слов у всех публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько публикаций обновлять одним запросом.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        posts = Post.objects.only('text').iterator(chunk_size=batch_size)
+        batch = []
+        updated = 0
+        for post in posts:
+            post.fill_text_stats()
+            batch.append(post)
+            if len(batch) == batch_size:
+                updated += Post.objects.bulk_update(
+                    batch, Post.TEXT_STATS_FIELDS
+                )
+                batch = []
+        updated += Post.objects.bulk_update(batch, Post.TEXT_STATS_FIELDS)
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено публикаций: {updated}')
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.search import rebuild_index, search_available
+
+
+class Command(BaseCommand):
+    help = ('Перестраивает полнотекстовый индекс публикаций, например '
+            'после загрузки данных в обход save().')
+
+    def handle(self, *args, **options):
+        if not search_available():
+            self.stdout.write('Полнотекстовый индекс есть только в SQLite.')
+            return
+        with transaction.atomic():
+            rebuild_index()
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс перестроен.'))
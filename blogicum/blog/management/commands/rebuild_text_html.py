@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from blog.constants import TEXT_RENDERER_VERSION
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = ('Отрисовывает HTML текста публикаций и комментариев, '
+            'сохранённый устаревшей версией.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько записей обновлять одним запросом.'
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Перерисовать все записи, а не только устаревшие.'
+        )
+
+    def rebuild(self, model, batch_size, rebuild_all):
+        objects = model.objects.only('text')
+        if not rebuild_all:
+            objects = objects.exclude(text_html_version=TEXT_RENDERER_VERSION)
+        batch = []
+        updated = 0
+        for obj in objects.iterator(chunk_size=batch_size):
+            obj.render_text_html()
+            batch.append(obj)
+            if len(batch) == batch_size:
+                updated += model.objects.bulk_update(
+                    batch, model.RENDERED_FIELDS
+                )
+                batch = []
+        updated += model.objects.bulk_update(batch, model.RENDERED_FIELDS)
+        return updated
+
+    def handle(self, *args, **options):
+        for model in (Post, Comment):
+            updated = self.rebuild(
+                model, options['batch_size'], options['all']
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'{model._meta.verbose_name_plural}: обновлено {updated}'
+            ))
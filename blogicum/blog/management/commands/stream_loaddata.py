@@ -0,0 +1,220 @@
+import itertools
+import json
+import sys
+from time import perf_counter
+
+from django.core import serializers
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers.base import DeserializationError
+from django.db import IntegrityError, connection, transaction
+
+from blog.cache import bump_generation
+from blog.models import Category, Comment, Post, RenderedTextModel
+from core.db import bulk_load, raw_upsert
+
+READ_CHUNK = 1 << 16
+WHITESPACE = ' \t\r\n'
+
+
+class JsonArrayReader:
+    """Буфер поверх потока с JSON-массивом."""
+
+    def __init__(self, stream, chunk_size):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def read_more(self):
+        """Дочитать кусок потока, отбросив уже разобранное."""
+        chunk = self.stream.read(self.chunk_size)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return not self.eof
+
+    def peek(self, skip):
+        """Первый символ после символов из skip или '' в конце потока."""
+        while True:
+            while (self.pos < len(self.buffer)
+                   and self.buffer[self.pos] in skip):
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.read_more():
+                return ''
+
+
+def iter_json_array(stream, chunk_size=READ_CHUNK):
+    """Элементы JSON-массива из потока по одному, без чтения файла целиком.
+
+    Ожидается массив объектов, как в выгрузке dumpdata.
+    """
+    decoder = json.JSONDecoder()
+    reader = JsonArrayReader(stream, chunk_size)
+    if reader.peek(WHITESPACE) != '[':
+        raise ValueError('Ожидался JSON-массив.')
+    reader.pos += 1
+    while (char := reader.peek(WHITESPACE + ',')) != ']':
+        if not char:
+            raise ValueError('Массив не закрыт.')
+        try:
+            item, reader.pos = decoder.raw_decode(reader.buffer, reader.pos)
+        except json.JSONDecodeError:
+            # Объект не поместился в буфер: дочитываем следующий кусок.
+            if not reader.read_more():
+                raise
+            continue
+        yield item
+        if reader.pos > chunk_size:
+            reader.buffer = reader.buffer[reader.pos:]
+            reader.pos = 0
+
+
+class Command(BaseCommand):
+    help = ('Потоково загружает выгрузку dumpdata в формате JSON: записи '
+            'читаются по одной, вставляются пачками по моделям в одной '
+            'транзакции, а индексы строятся после загрузки.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'fixture', help='Путь к JSON-файлу или «-» для stdin.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько записей одной модели вставлять одним запросом.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=50000,
+            help='Сколько записей читать из файла и разбирать за раз.'
+        )
+        parser.add_argument(
+            '--ignorenonexistent', '-i', action='store_true',
+            help='Пропускать поля, которых нет в моделях.'
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.ignorenonexistent = options['ignorenonexistent']
+        self.counts = {}
+        started = perf_counter()
+        if options['fixture'] == '-':
+            self.load(sys.stdin, options['chunk_size'])
+        else:
+            try:
+                with open(options['fixture'], encoding='utf-8') as stream:
+                    self.load(stream, options['chunk_size'])
+            except OSError as error:
+                raise CommandError(error)
+        self.after_load()
+        for model, count in self.counts.items():
+            self.stdout.write(f'{model._meta.label}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено записей: {sum(self.counts.values())} '
+            f'за {perf_counter() - started:.1f} с'
+        ))
+
+    def load(self, stream, chunk_size):
+        """Загрузить записи кусками по chunk_size в одной транзакции.
+
+        Как и loaddata, проверку внешних ключей откладываем до конца
+        загрузки: запись может ссылаться на строку из следующего куска.
+        При любой ошибке транзакция откатывается, и в базе не остаётся
+        части выгрузки.
+        """
+        records = iter_json_array(stream)
+        try:
+            with transaction.atomic(), \
+                    connection.constraint_checks_disabled(), \
+                    bulk_load() as deferred:
+                while chunk := list(itertools.islice(records, chunk_size)):
+                    self.load_chunk(chunk, deferred)
+                tables = [model._meta.db_table for model in self.counts]
+                connection.check_constraints(table_names=tables)
+        except (ValueError, DeserializationError) as error:
+            raise CommandError(f'Ошибка в выгрузке: {error}')
+        except IntegrityError as error:
+            raise CommandError(
+                f'Выгрузка нарушает ограничения базы, ничего не '
+                f'загружено: {error}'
+            )
+
+    def load_chunk(self, records, deferred):
+        pending = {}
+        for deserialized in serializers.deserialize(
+            'python', records, ignorenonexistent=self.ignorenonexistent
+        ):
+            obj = deserialized.object
+            model = type(obj)
+            if model not in pending:
+                deferred.defer(model)
+                pending[model] = []
+            self.prepare(obj)
+            batch = pending[model]
+            batch.append(deserialized)
+            if len(batch) >= self.batch_size:
+                self.flush(model, batch)
+                batch.clear()
+        for model, batch in pending.items():
+            self.flush(model, batch)
+
+    def prepare(self, obj):
+        """Заполнить производные поля, которые обычно считает save()."""
+        if isinstance(obj, RenderedTextModel):
+            obj.render_text_html()
+        if isinstance(obj, Post):
+            obj.fill_text_stats()
+
+    def flush(self, model, batch):
+        """Вставить или обновить записи одной модели.
+
+        Записи вставляются как есть, без pre_save, как при loaddata:
+        так сохраняются даты auto_now_add из выгрузки (см. raw_upsert).
+        """
+        if not batch:
+            return
+        if model._meta.parents or any(
+            item.object.pk is None for item in batch
+        ):
+            for item in batch:
+                item.save()
+        else:
+            raw_upsert(model, [item.object for item in batch])
+        for item in batch:
+            self.save_m2m(item)
+        self.counts[model] = self.counts.get(model, 0) + len(batch)
+
+    def save_m2m(self, deserialized):
+        obj = deserialized.object
+        for name, values in (deserialized.m2m_data or {}).items():
+            field = obj._meta.get_field(name)
+            through = field.remote_field.through
+            source = f'{field.m2m_field_name()}_id'
+            target = f'{field.m2m_reverse_field_name()}_id'
+            through._base_manager.bulk_create(
+                [through(**{source: obj.pk, target: value})
+                 for value in values],
+                ignore_conflicts=True,
+            )
+
+    def after_load(self):
+        """Досчитать то, что зависит от нескольких таблиц сразу."""
+        models = set(self.counts)
+        if not models:
+            return
+        sequence_sql = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for sql in sequence_sql:
+                cursor.execute(sql)
+        if models & {Post, Comment}:
+            call_command('rebuild_comment_counts', stdout=self.stdout)
+        if Post in models:
+            call_command('rebuild_search_index', stdout=self.stdout)
+        if models & {Post, Category}:
+            call_command(
+                'publish_scheduled_posts', reconcile=True, stdout=self.stdout
+            )
+        bump_generation()
@@ -2,6 +2,40 @@ from django.db import models
 from django.utils import timezone
 
 
+def visibility_rule(now=None):
+    """Условие, по которому вычисляется флаг is_visible публикации.
+
+    Публикация видна всем, если она опубликована, её время наступило
+    и её категория опубликована.
+    """
+    return models.Q(
+        is_published=True,
+        pub_date__lte=now or timezone.now(),
+        category__is_published=True,
+    )
+
+
+def published_filter(prefix=''):
+    """Условие, при котором публикация видна всем пользователям.
+
+    Проверяет материализованный флаг is_visible, который поддерживают
+    Post.save, сигналы категорий и планировщик публикаций.
+    prefix позволяет применить условие через связь, например 'posts__'.
+    """
+    return models.Q(**{f'{prefix}is_visible': True})
+
+
+def visible_filter(user):
+    """Условие видимости публикации для пользователя user.
+
+    Автор видит свои публикации всегда, остальные — только опубликованные.
+    """
+    condition = published_filter()
+    if user.is_authenticated:
+        condition |= models.Q(author=user)
+    return condition
+
+
 class FilteredPosts(models.Manager):
     """Кастомный менеджер для модели Post."""
 
@@ -9,7 +43,4 @@ class FilteredPosts(models.Manager):
         """Получить отфильтрованный QuerySet."""
         return super().get_queryset().select_related(
             'author', 'location', 'category'
-        ).filter(is_published=True,
-                 pub_date__lte=timezone.now(),
-                 category__is_published=True
-                 )
+        ).filter(published_filter())
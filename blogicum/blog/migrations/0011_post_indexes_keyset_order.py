@@ -0,0 +1,37 @@
+# Generated by Django 4.2.16 on 2026-10-18 01:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_comment_count'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_published_pub_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_published_category_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_author_pub_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['pub_date'], name='post_published_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['category', 'pub_date'], name='post_published_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', 'pub_date'], name='post_author_pub_date_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.16 on 2026-10-18 01:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_indexes_keyset_order'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='publication',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='blog.post', verbose_name='Публикация'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['publication', 'created_at'], name='comment_publication_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.16 on 2026-10-18 01:38
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+BATCH_SIZE = 1000
+
+
+def fill_excerpts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    batch = []
+    for post in Post.objects.only('text').iterator(chunk_size=BATCH_SIZE):
+        post.excerpt = Truncator(post.text).words(10, truncate=' …')
+        post.word_count = len(post.text.split())
+        batch.append(post)
+        if len(batch) == BATCH_SIZE:
+            Post.objects.bulk_update(batch, ('excerpt', 'word_count'))
+            batch = []
+    Post.objects.bulk_update(batch, ('excerpt', 'word_count'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_comment_publication_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(default='', editable=False, help_text='Начало текста для карточки, обновляется автоматически.', verbose_name='Анонс'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество слов'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
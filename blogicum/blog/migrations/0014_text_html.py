@@ -0,0 +1,33 @@
+# Generated by Django 4.2.16 on 2026-10-18 01:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='text_html',
+            field=models.TextField(default='', editable=False, help_text='Отрисованный текст, обновляется автоматически.', verbose_name='Текст в HTML'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='text_html_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Версия отрисовки текста'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(default='', editable=False, help_text='Отрисованный текст, обновляется автоматически.', verbose_name='Текст в HTML'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Версия отрисовки текста'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+TOKENIZE = "tokenize = 'unicode61 remove_diacritics 2'"
+CREATE_TABLES = (
+    f'CREATE VIRTUAL TABLE blog_post_search USING fts5(title, text, {TOKENIZE})',
+    f'CREATE VIRTUAL TABLE blog_post_search_title USING fts5(title, {TOKENIZE})',
+)
+FILL_TABLES = (
+    'INSERT INTO blog_post_search (rowid, title, text) '
+    'SELECT id, title, text FROM blog_post',
+    'INSERT INTO blog_post_search_title (rowid, title) '
+    'SELECT id, title FROM blog_post',
+)
+
+
+def create_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in (*CREATE_TABLES, *FILL_TABLES):
+        schema_editor.execute(sql)
+
+
+def drop_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE blog_post_search')
+    schema_editor.execute('DROP TABLE blog_post_search_title')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
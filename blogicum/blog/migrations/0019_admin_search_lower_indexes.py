@@ -0,0 +1,42 @@
+# Generated by Django 4.2.16 on 2026-10-18 02:48
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.functions.text
+
+# Таблица пользователей не принадлежит приложению blog, поэтому индекс
+# для поиска авторов по началу имени создаётся здесь вручную.
+USERNAME_INDEX = models.Index(
+    django.db.models.functions.text.Lower('username'),
+    name='user_username_lower_idx',
+)
+
+
+def add_username_index(apps, schema_editor):
+    user = apps.get_model(settings.AUTH_USER_MODEL)
+    schema_editor.add_index(user, USERNAME_INDEX)
+
+
+def remove_username_index(apps, schema_editor):
+    user = apps.get_model(settings.AUTH_USER_MODEL)
+    schema_editor.remove_index(user, USERNAME_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_admin_changelist_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(django.db.models.functions.text.Lower('title'), name='category_title_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='location_name_lower_idx'),
+        ),
+        migrations.RunPython(add_username_index, remove_username_index),
+    ]
@@ -1,21 +1,70 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Count
+from django.http import Http404
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.views.generic import ListView
 
-from blog.constants import POST_COUNT
+from blog.constants import COMMENT_COUNT, POST_COUNT
 from blog.models import Comment, Post
+from blog.paginators import (CachedCountPaginator, CursorPaginator,
+                             InvalidCursor, get_page_range)
+from core.metrics import PAGE_BUCKETS, registry
 
 
 class PostViewMixin(ListView):
     model = Post
     paginate_by = POST_COUNT
-
-    def get_comment_count(self, qs):
-        """Добавляет поле с кол-ом комментариев к посту."""
-        return qs.annotate(comment_count=Count('comments')
-                           ).order_by('-pub_date')
+    ordering = ('-pub_date', '-pk')
+    paginator_class = CachedCountPaginator
+    cache_rows = False
+
+    def get_count_signature(self):
+        """Сигнатура выборки для кеширования числа публикаций."""
+        return None
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset, per_page, signature=self.get_count_signature(),
+            cache_rows=self.cache_rows, **kwargs
+        )
+
+    def get_ordered(self, qs):
+        """Сортирует посты; полный текст в списках не загружается."""
+        return qs.defer('text', 'text_html').order_by(*self.ordering)
+
+    def use_cursor_pagination(self):
+        """Курсорная пагинация включается настройкой или курсором в URL."""
+        return (getattr(settings, 'BLOG_CURSOR_PAGINATION', False)
+                or 'after' in self.request.GET
+                or 'before' in self.request.GET)
+
+    def record_page_depth(self, page):
+        """Учесть номер запрошенной страницы в метриках."""
+        match = self.request.resolver_match
+        if match is not None:
+            registry.observe('paginator_page', (('view', match.view_name),),
+                             page.number, PAGE_BUCKETS)
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor_pagination():
+            result = super().paginate_queryset(queryset, page_size)
+            self.record_page_depth(result[1])
+            return result
+        paginator = CursorPaginator(queryset, page_size,
+                                    ordering=self.ordering)
+        try:
+            page = paginator.page(after=self.request.GET.get('after'),
+                                  before=self.request.GET.get('before'))
+        except InvalidCursor:
+            raise Http404('Неверный курсор страницы.')
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if context.get('page_obj') is not None:
+            context['page_range'] = get_page_range(context['page_obj'])
+        return context
 
 
 class PostCrudMixin(LoginRequiredMixin):
@@ -28,7 +77,20 @@ class PostCrudMixin(LoginRequiredMixin):
         return reverse('blog:profile', kwargs={'username': self.request.user})
 
 
-class PostAccessEditMixin(UserPassesTestMixin):
+class CachedObjectMixin:
+    """Кастомный класс Миксин, запоминающий объект на время запроса."""
+
+    _cached_object = None
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if self._cached_object is None:
+            self._cached_object = super().get_object()
+        return self._cached_object
+
+
+class PostAccessEditMixin(CachedObjectMixin, UserPassesTestMixin):
     """Кастомный класс Миксин для проверки доступа к редактированию Post."""
 
     pk_url_kwarg = 'post_id'
@@ -37,8 +99,7 @@ class PostAccessEditMixin(UserPassesTestMixin):
         return redirect('blog:post_detail', self.get_object().id)
 
     def test_func(self):
-        object = self.get_object()
-        return object.author == self.request.user
+        return self.get_object().author_id == self.request.user.id
 
 
 class CommentCrudMixin(LoginRequiredMixin):
@@ -49,3 +110,38 @@ class CommentCrudMixin(LoginRequiredMixin):
     def get_success_url(self):
         return reverse('blog:post_detail',
                        kwargs={'post_id': self.object.publication_id})
+
+
+class CommentAccessEditMixin(CachedObjectMixin, UserPassesTestMixin):
+    """Кастомный класс Миксин для проверки доступа к изменению Comments."""
+
+    pk_url_kwarg = 'comment_id'
+
+    def get_queryset(self):
+        """Комментарий ищется только среди комментариев поста из URL."""
+        return super().get_queryset().filter(
+            publication_id=self.kwargs['post_id']
+        )
+
+    def test_func(self):
+        return self.get_object().author_id == self.request.user.id
+
+
+class CommentPageMixin:
+    """Кастомный класс Миксин для курсорной пагинации комментариев."""
+
+    comments_per_page = COMMENT_COUNT
+
+    def get_comment_page(self, post_id, after=None):
+        """Страница комментариев к посту после курсора after."""
+        paginator = CursorPaginator(
+            Comment.objects.select_related('author').filter(
+                publication_id=post_id
+            ),
+            self.comments_per_page,
+            ordering=('created_at', 'pk')
+        )
+        try:
+            return paginator.page(after=after)
+        except InvalidCursor:
+            raise Http404('Неверный курсор страницы.')
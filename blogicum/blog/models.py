@@ -1,14 +1,64 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models.functions import Lower
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.safestring import mark_safe
 
-from blog.constants import TITLE_SLICE
+from blog.constants import TEXT_RENDERER_VERSION, TITLE_SLICE
 from blog.managers import FilteredPosts
+from blog.utils import (count_words, make_excerpt, reading_minutes,
+                        render_text)
 from core.models import PublishedModel
 
 User = get_user_model()
 
 
+class RenderedTextModel(models.Model):
+    """Абстрактная модель с сохранённым HTML поля text."""
+
+    RENDERED_FIELDS = ('text_html', 'text_html_version')
+
+    text_html = models.TextField(
+        default='',
+        editable=False,
+        verbose_name='Текст в HTML',
+        help_text='Отрисованный текст, обновляется автоматически.'
+    )
+
+    text_html_version = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия отрисовки текста'
+    )
+
+    class Meta:
+        abstract = True
+
+    @property
+    def body_html(self):
+        """HTML текста; устаревшая версия отрисовывается на лету."""
+        if self.text_html_version == TEXT_RENDERER_VERSION:
+            return mark_safe(self.text_html)
+        return render_text(self.text)
+
+    def render_text_html(self):
+        """Пересчитать HTML по тексту."""
+        self.text_html = render_text(self.text)
+        self.text_html_version = TEXT_RENDERER_VERSION
+
+    def save(self, *args, **kwargs):
+        """Отрисовать HTML, если сохраняется текст."""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'text' in update_fields:
+            self.render_text_html()
+            if update_fields is not None:
+                kwargs['update_fields'] = {
+                    *update_fields, *self.RENDERED_FIELDS
+                }
+        super().save(*args, **kwargs)
+
+
 class Category(PublishedModel):
     """Модель Тематической категории."""
 
@@ -33,6 +83,10 @@ class Category(PublishedModel):
     class Meta:
         verbose_name = 'категория'
         verbose_name_plural = 'Категории'
+        indexes = (
+            models.Index(fields=('title',), name='category_title_idx'),
+            models.Index(Lower('title'), name='category_title_lower_idx'),
+        )
 
     def __str__(self):
         """Именует объекты значением из поля title."""
@@ -51,15 +105,41 @@ class Location(PublishedModel):
     class Meta:
         verbose_name = 'местоположение'
         verbose_name_plural = 'Местоположения'
+        indexes = (
+            models.Index(fields=('name',), name='location_name_idx'),
+            models.Index(Lower('name'), name='location_name_lower_idx'),
+        )
 
     def __str__(self):
         """Именует объекты значением из поля title."""
         return self.name[:TITLE_SLICE]
 
 
-class Post(PublishedModel):
+class CounterField(models.PositiveIntegerField):
+    """Счётчик, который сохранение модели не перезаписывает.
+
+    При обновлении строки save() записывает в колонку её же значение,
+    поэтому устаревший экземпляр не затирает счётчик. Менять его нужно
+    через QuerySet.update() с F().
+    """
+
+    def pre_save(self, model_instance, add):
+        if add:
+            return super().pre_save(model_instance, add)
+        return models.F(self.attname)
+
+    def deconstruct(self):
+        # Для базы это обычное целое поле: миграции его так и видят.
+        name, path, args, kwargs = super().deconstruct()
+        return name, 'django.db.models.PositiveIntegerField', args, kwargs
+
+
+class Post(RenderedTextModel, PublishedModel):
     """Модель Публикации."""
 
+    TEXT_STATS_FIELDS = ('excerpt', 'word_count')
+    VISIBILITY_FIELDS = ('is_published', 'pub_date', 'category')
+
     title = models.CharField(
         max_length=256,
         verbose_name='Заголовок',
@@ -80,6 +160,7 @@ class Post(PublishedModel):
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Автор публикации',
         help_text='Выберете автора публикации.',
     )
@@ -108,28 +189,121 @@ class Post(PublishedModel):
         blank=True, verbose_name='Изображение', upload_to='posts_images'
     )
 
+    comment_count = CounterField(
+        default=0,
+        editable=False,
+        verbose_name='Комментарии',
+        help_text='Количество комментариев, обновляется автоматически.'
+    )
+
+    excerpt = models.TextField(
+        default='',
+        editable=False,
+        verbose_name='Анонс',
+        help_text='Начало текста для карточки, обновляется автоматически.'
+    )
+
+    word_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество слов'
+    )
+
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Видна всем',
+        help_text=('Опубликована, время публикации наступило и категория '
+                   'опубликована; обновляется автоматически.')
+    )
+
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
         ordering = ('-pub_date', )
+        indexes = (
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_visible=True),
+                name='post_published_pub_date_idx'
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                condition=models.Q(is_visible=True),
+                name='post_published_category_idx'
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=('pub_date',),
+                name='post_pub_date_idx'
+            ),
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_published=True, is_visible=False),
+                name='post_scheduled_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         """Именует объекты значением из поля title."""
         return self.title[:TITLE_SLICE]
 
+    @property
+    def reading_time(self):
+        """Время чтения публикации в минутах."""
+        return reading_minutes(self.word_count)
+
+    def fill_text_stats(self):
+        """Пересчитать анонс и количество слов по тексту."""
+        self.excerpt = make_excerpt(self.text)
+        self.word_count = count_words(self.text)
+
+    def fill_visibility(self):
+        """Пересчитать флаг is_visible по текущему времени."""
+        self.is_visible = bool(
+            self.is_published
+            and self.pub_date is not None
+            and self.pub_date <= timezone.now()
+            and self.category_id is not None
+            and Category.objects.filter(
+                pk=self.category_id, is_published=True
+            ).exists()
+        )
+
+    def save(self, *args, **kwargs):
+        """Обновить производные поля."""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'text' in update_fields:
+            self.fill_text_stats()
+            if update_fields is not None:
+                update_fields = {*update_fields, *self.TEXT_STATS_FIELDS}
+        if update_fields is None or set(update_fields).intersection(
+            self.VISIBILITY_FIELDS
+        ):
+            self.fill_visibility()
+            if update_fields is not None:
+                update_fields = {*update_fields, 'is_visible'}
+        if update_fields is not None:
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
     def get_absolute_url(self):
 
         return reverse('blog:post_detail', kwargs={'post_id': self.pk})
 
 
-class Comment(models.Model):
+class Comment(RenderedTextModel):
     """Класс модели для Комментариев."""
 
     text = models.TextField(verbose_name='Текст комментария')
     publication = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Публикация'
     )
     created_at = models.DateTimeField(auto_now_add=True,
@@ -143,6 +317,16 @@ class Comment(models.Model):
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
         default_related_name = 'comments'
+        indexes = (
+            models.Index(
+                fields=('publication', 'created_at'),
+                name='comment_publication_idx'
+            ),
+            models.Index(
+                fields=('created_at',),
+                name='comment_created_at_idx'
+            ),
+        )
 
     def __str__(self):
         """Именование объекта."""
@@ -0,0 +1,363 @@
+import base64
+import binascii
+import datetime
+import hashlib
+import json
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import BigIntegerField, Q
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from blog.cache import (COMMENTS, POSTS, USERS, make_key, model_generations,
+                        time_bucket)
+from blog.constants import (ADMIN_COUNT_LIMIT, COUNT_CACHE_TIMEOUT,
+                            PAGE_RANGE_ON_EACH_SIDE, PAGE_RANGE_ON_ENDS)
+from blog.scheduler import cached_next_due_date
+from core.metrics import record_cache
+
+
+def get_page_range(page):
+    """Сокращённый список номеров страниц вокруг текущей.
+
+    Возвращает None, если число страниц неизвестно или пагинация
+    курсорная: тогда шаблон выводит только ссылки «вперёд/назад».
+    """
+    if getattr(page, 'is_cursor', False):
+        return None
+    if getattr(page, 'is_uncounted', False):
+        return None
+    return page.paginator.get_elided_page_range(
+        page.number,
+        on_each_side=PAGE_RANGE_ON_EACH_SIDE,
+        on_ends=PAGE_RANGE_ON_ENDS
+    )
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Кодирует даты без потери микросекунд, чтобы курсор был точным."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class InvalidCursor(Exception):
+    """Курсор страницы повреждён или не соответствует сортировке."""
+
+
+class CursorPage(Sequence):
+    """Страница курсорной пагинации, совместимая с шаблоном пагинатора."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if self.object_list:
+            return self.paginator.encode_cursor(self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.object_list:
+            return self.paginator.encode_cursor(self.object_list[0])
+        return None
+
+
+class CursorPaginator:
+    """Пагинатор по ключу сортировки вместо OFFSET.
+
+    Страница выбирается условием «строго после» или «строго до» ключа
+    последней показанной записи, поэтому время ответа не зависит от
+    глубины страницы. Курсор — непрозрачная base64-строка со значениями
+    полей сортировки.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-pk')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = tuple(name.lstrip('-') for name in self.ordering)
+
+    def _get_field(self, name):
+        opts = self.queryset.model._meta
+        return opts.pk if name == 'pk' else opts.get_field(name)
+
+    def encode_cursor(self, obj):
+        values = [getattr(obj, name) for name in self.fields]
+        raw = json.dumps(values, cls=CursorEncoder).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            values = json.loads(raw)
+        except (binascii.Error, ValueError) as error:
+            raise InvalidCursor(cursor) from error
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            raise InvalidCursor(cursor)
+        # Курсор приходит из URL и может быть собран вручную. SQLite не
+        # принимает целые больше 64 бит, clean() отклоняет null, а
+        # TypeError бросают to_python полей, которым передали список или
+        # словарь.
+        if any(isinstance(value, int)
+               and abs(value) > BigIntegerField.MAX_BIGINT
+               for value in values):
+            raise InvalidCursor(cursor)
+        try:
+            return [
+                self._get_field(name).clean(value, None)
+                for name, value in zip(self.fields, values)
+            ]
+        except (TypeError, ValidationError) as error:
+            raise InvalidCursor(cursor) from error
+
+    def _seek(self, values, forward):
+        """Условие для записей, идущих после (или до) ключа values."""
+        condition = Q()
+        for position, ordering in enumerate(self.ordering):
+            descending = ordering.startswith('-')
+            lookup = 'lt' if descending == forward else 'gt'
+            equal = dict(zip(self.fields[:position], values[:position]))
+            equal[f'{self.fields[position]}__{lookup}'] = values[position]
+            condition |= Q(**equal)
+        return condition
+
+    def _reverse_ordering(self):
+        return tuple(
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        )
+
+    def page(self, after=None, before=None):
+        """Вернуть страницу после курсора after или до курсора before."""
+        if before is not None:
+            values = self.decode_cursor(before)
+            rows = list(
+                self.queryset.filter(self._seek(values, forward=False))
+                .order_by(*self._reverse_ordering())[:self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            return CursorPage(rows, self, True, has_previous)
+
+        queryset = self.queryset.order_by(*self.ordering)
+        if after is not None:
+            values = self.decode_cursor(after)
+            queryset = queryset.filter(self._seek(values, forward=True))
+        rows = list(queryset[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        return CursorPage(rows[:self.per_page], self, has_next,
+                          after is not None)
+
+
+class UncountedPage(Page):
+    """Страница, наличие следующей страницы у которой известно без COUNT."""
+
+    is_uncounted = True
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class CachedCountPaginator(Paginator):
+    """Пагинатор, кеширующий COUNT(*) по сигнатуре выборки.
+
+    Сигнатура описывает выборку (лента, категория, автор, видимость);
+    кеш сбрасывается сменой поколения групп данных generations, по
+    умолчанию — публикаций и категорий. При промахе COUNT считается
+    только для первой страницы, а глубокие страницы отдаются в режиме
+    «N+1 строка»: следующая страница существует, если выбралась лишняя
+    запись.
+
+    С cache_rows=True кешируются и сами записи страниц, если задана
+    настройка BLOG_LIST_CACHE_GRANULARITY: время делится на интервалы
+    такой длины в секундах, а запись живёт до конца интервала, но не
+    дольше, чем до ближайшей отложенной публикации.
+    """
+
+    def __init__(self, object_list, per_page, signature=None,
+                 cache_rows=False, generations=(POSTS,), **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.signature = signature
+        self.cache_rows = cache_rows
+        self.generations = generations
+
+    @cached_property
+    def cache_key(self):
+        if self.signature is None:
+            return None
+        return make_key('count', self.signature, self.generations)
+
+    @cached_property
+    def cached_count(self):
+        if self.cache_key is None:
+            return None
+        count = cache.get(self.cache_key)
+        record_cache('post_count', count is not None)
+        return count
+
+    def store_count(self, count):
+        self.__dict__['count'] = count
+        if self.cache_key is not None:
+            cache.set(self.cache_key, count, COUNT_CACHE_TIMEOUT)
+
+    @cached_property
+    def count(self):
+        if self.cached_count is not None:
+            return self.cached_count
+        count = Paginator.count.func(self)
+        self.store_count(count)
+        return count
+
+    @property
+    def count_known(self):
+        """Известно ли число записей без дополнительного запроса."""
+        return 'count' in self.__dict__ or self.cached_count is not None
+
+    def validate_number(self, number):
+        if self.count_known or number == 1:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Номер страницы должен быть целым.')
+        if number < 1:
+            raise EmptyPage('Номер страницы меньше 1.')
+        return number
+
+    @property
+    def rows_granularity(self):
+        if not self.cache_rows or self.signature is None:
+            return None
+        return getattr(settings, 'BLOG_LIST_CACHE_GRANULARITY', None)
+
+    def get_rows(self, bottom, top):
+        """Записи object_list[bottom:top], по возможности из кеша."""
+        granularity = self.rows_granularity
+        if not granularity:
+            return list(self.object_list[bottom:top])
+        now = timezone.now()
+        next_due = cached_next_due_date()
+        start, end = time_bucket(now, granularity)
+        # В строках лент есть счётчик комментариев и имя автора.
+        key = make_key(
+            'rows', (*self.signature, bottom, top, int(start.timestamp())),
+            (POSTS, COMMENTS, USERS)
+        )
+        rows = cache.get(key)
+        record_cache('post_rows', rows is not None)
+        if rows is None:
+            rows = list(self.object_list[bottom:top])
+            expires = end
+            # Просроченную публикацию откроет планировщик и сменит
+            # поколение кеша, поэтому ограничивает срок только будущая.
+            if next_due is not None and next_due > now:
+                expires = min(end, next_due)
+            timeout = (expires - now).total_seconds()
+            if timeout > 0:
+                cache.set(key, rows, timeout)
+        return rows
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        if self.count_known:
+            top = bottom + self.per_page
+            if top + self.orphans >= self.count:
+                top = self.count
+            return self._get_page(self.get_rows(bottom, top), number, self)
+        rows = self.get_rows(bottom, bottom + self.per_page + 1)
+        if not rows:
+            raise EmptyPage('На этой странице нет результатов.')
+        has_next = len(rows) > self.per_page
+        if not has_next:
+            self.store_count(bottom + len(rows))
+        return UncountedPage(rows[:self.per_page], number, self, has_next)
+
+
+def queryset_signature(queryset):
+    """Сигнатура выборки по её SQL без сортировки или None для пустой."""
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+    except EmptyResultSet:
+        return None
+    digest = hashlib.sha1(repr((sql, params)).encode()).hexdigest()
+    return (queryset.model._meta.label, digest)
+
+
+class EstimatedCountPaginator(CachedCountPaginator):
+    """Пагинатор списков админки без полного COUNT(*) на каждый запрос.
+
+    Точное число записей берётся из кеша по SQL выборки. При промахе
+    строки считаются не дальше limit: если их меньше, число точное и
+    сохраняется в кеш, иначе count равен limit, а count_is_estimate
+    показывает, что записей не меньше. limit растёт вместе с номером
+    страницы, чтобы ссылка на следующую страницу оставалась. С
+    exact=True число считается полностью.
+    """
+
+    count_is_estimate = False
+
+    def __init__(self, object_list, per_page, page_number=1, exact=False,
+                 limit=ADMIN_COUNT_LIMIT, **kwargs):
+        signature = queryset_signature(object_list)
+        if signature is not None:
+            signature = ('admin', *signature)
+        super().__init__(object_list, per_page, signature=signature,
+                         generations=model_generations(object_list.model),
+                         **kwargs)
+        self.exact = exact
+        self.limit = max(limit, page_number * self.per_page) + 1
+
+    @cached_property
+    def count(self):
+        if self.cached_count is not None and not self.exact:
+            return self.cached_count
+        if self.exact:
+            count = Paginator.count.func(self)
+        else:
+            count = self.object_list[:self.limit].count()
+            if count >= self.limit:
+                self.count_is_estimate = True
+                return count
+        self.store_count(count)
+        return count
+
+    def page(self, number):
+        # Формам списка в админке нужен QuerySet, а не список строк.
+        return Paginator.page(self, number)
@@ -0,0 +1,80 @@
+"""Планировщик публикаций: поддержка флага Post.is_visible.
+
+Флаг зависит от текущего времени, поэтому отложенные публикации нужно
+периодически открывать. Это делает команда publish_scheduled_posts,
+запускаемая по расписанию или в режиме постоянного цикла.
+"""
+from django.core.cache import cache
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from blog.cache import POSTS, bump_generation, make_key
+from blog.constants import COUNT_CACHE_TIMEOUT
+from blog.managers import visibility_rule
+from blog.models import Post
+from core.metrics import record_cache
+
+
+def scheduled_posts():
+    """Публикации, которые станут видны, когда наступит их время."""
+    return Post.objects.filter(
+        is_published=True, is_visible=False, category__is_published=True
+    )
+
+
+def next_due_date():
+    """Время ближайшей отложенной публикации или None."""
+    return scheduled_posts().aggregate(
+        next_due=Min('pub_date')
+    )['next_due']
+
+
+def cached_next_due_date():
+    """next_due_date(), сохранённое в кеше до изменения публикаций."""
+    key = make_key('next_due', ('posts',))
+    cached = cache.get(key)
+    record_cache('next_due', cached is not None)
+    if cached is None:
+        cached = (next_due_date(),)
+        cache.set(key, cached, COUNT_CACHE_TIMEOUT)
+    return cached[0]
+
+
+def publish_due_posts(now=None):
+    """Открыть публикации, время которых наступило."""
+    updated = scheduled_posts().filter(
+        pub_date__lte=now or timezone.now()
+    ).update(is_visible=True)
+    if updated:
+        bump_generation(POSTS)
+    return updated
+
+
+def sync_category_posts(category):
+    """Привести флаг публикаций категории к её состоянию."""
+    posts = Post.objects.filter(category=category)
+    if category.is_published:
+        updated = posts.filter(
+            is_published=True, is_visible=False,
+            pub_date__lte=timezone.now()
+        ).update(is_visible=True)
+    else:
+        updated = posts.filter(is_visible=True).update(is_visible=False)
+    return updated
+
+
+def reconcile_visibility(now=None):
+    """Исправить флаг у всех публикаций, изменённых в обход save().
+
+    Возвращает число открытых и скрытых публикаций.
+    """
+    rule = visibility_rule(now)
+    shown = Post.objects.filter(rule, is_visible=False).update(
+        is_visible=True
+    )
+    hidden = Post.objects.filter(~Q(rule), is_visible=True).update(
+        is_visible=False
+    )
+    if shown or hidden:
+        bump_generation(POSTS)
+    return shown, hidden
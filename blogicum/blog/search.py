@@ -0,0 +1,261 @@
+"""Полнотекстовый поиск по публикациям на SQLite FTS5.
+
+Заголовки и тексты публикаций копируются в виртуальную таблицу
+SEARCH_TABLE, а заголовки ещё и в TITLE_TABLE; rowid в обеих равен id
+публикации. Таблицы поддерживают сигналы Post, а после массовых
+загрузок — команда rebuild_search_index.
+
+Выдача делится на ранги: сначала публикации, в заголовке которых есть
+все слова запроса, затем остальные совпадения, внутри ранга — по
+убыванию id, то есть недавно добавленные выше, независимо от даты
+публикации. bm25 из FTS5 не используется: для каждого слова он считает
+совпадения по всей таблице, и частые слова на миллионе публикаций
+ищутся секундами. Обход по rowid же останавливается на первой
+странице, а страницы выбираются по ключу (ранг, id).
+На других СУБД таблиц нет, и поиск сводится к icontains по заголовку
+и тексту.
+"""
+import re
+
+from django.db import connection, models
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from blog.constants import SEARCH_SNIPPET_TOKENS
+from blog.models import Post
+from blog.paginators import CursorPage, CursorPaginator, InvalidCursor
+
+SEARCH_TABLE = 'blog_post_search'
+TITLE_TABLE = 'blog_post_search_title'
+RANK_TITLE = 0
+RANK_TEXT = 1
+# Управляющие символы вместо тегов: текст экранируется уже после
+# подсветки, а в пользовательском тексте они не встречаются.
+MARK_START = '\x02'
+MARK_END = '\x03'
+ELLIPSIS = '…'
+
+
+def search_available():
+    return connection.vendor == 'sqlite'
+
+
+def build_match(query, prefix=False):
+    """Запрос FTS5 из пользовательской строки или None, если слов нет.
+
+    Каждое слово берётся в кавычки, поэтому синтаксис FTS5 в запросе не
+    работает; слова ищутся все сразу, целиком или с prefix=True как
+    начала слов.
+    """
+    words = re.findall(r'\w+', query.lower())
+    suffix = '*' if prefix else ''
+    return ' '.join(f'"{word}"{suffix}' for word in words) or None
+
+
+def matching_ids(field, query):
+    """RawSQL с id публикаций, в поле field которых есть начала всех слов.
+
+    Подходит для фильтра pk__in; field — 'title' или 'text'. Возвращает
+    None, если индекса нет или в запросе нет слов.
+    """
+    match = build_match(query, prefix=True)
+    if match is None or not search_available():
+        return None
+    if field == 'title':
+        table = TITLE_TABLE
+    elif field == 'text':
+        table, match = SEARCH_TABLE, f'{{text}} : ({match})'
+    else:
+        raise ValueError(f'Поля {field} нет в поисковом индексе.')
+    return RawSQL(
+        f'SELECT rowid FROM {table} WHERE {table} MATCH %s', (match,)
+    )
+
+
+def mark(text):
+    """Экранировать фрагмент и превратить маркеры совпадений в <mark>."""
+    return mark_safe(
+        escape(text).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+    )
+
+
+def index_posts(queryset):
+    """Переиндексировать публикации из queryset.
+
+    FTS5 поддерживает INSERT OR REPLACE по rowid, поэтому старые строки
+    удаляются той же вставкой.
+    """
+    if not search_available():
+        return
+    queryset = queryset.order_by()
+    with connection.cursor() as cursor:
+        for table, fields in ((SEARCH_TABLE, ('title', 'text')),
+                              (TITLE_TABLE, ('title',))):
+            select_sql, params = (
+                queryset.values_list('pk', *fields).query.sql_with_params()
+            )
+            cursor.execute(
+                f'INSERT OR REPLACE INTO {table} '
+                f'(rowid, {", ".join(fields)}) {select_sql}',
+                params
+            )
+
+
+def index_post(post):
+    index_posts(Post.objects.filter(pk=post.pk))
+
+
+def remove_post(post_id):
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        for table in (SEARCH_TABLE, TITLE_TABLE):
+            cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [post_id])
+
+
+def rebuild_index():
+    """Построить индекс заново по всем публикациям."""
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        for table in (SEARCH_TABLE, TITLE_TABLE):
+            cursor.execute(f'DELETE FROM {table}')
+    index_posts(Post.objects.all())
+    with connection.cursor() as cursor:
+        for table in (SEARCH_TABLE, TITLE_TABLE):
+            cursor.execute(
+                f"INSERT INTO {table} ({table}) VALUES ('optimize')"
+            )
+
+
+class SearchPaginator(CursorPaginator):
+    """Курсорная пагинация результатов поиска по ключу (ранг, id).
+
+    Видимость проверяется по флагу is_visible в том же запросе, что и
+    совпадения, а публикации с автором, категорией и местоположением
+    загружаются вторым запросом через Post.filtered.
+    """
+
+    def __init__(self, query, per_page):
+        super().__init__(Post.filtered.all(), per_page,
+                         ordering=('search_rank', '-pk'))
+        self.query = query
+        self.match = build_match(query)
+
+    def _get_field(self, name):
+        if name == 'search_rank':
+            return models.IntegerField()
+        return super()._get_field(name)
+
+    def rank_query(self, rank):
+        """FROM и WHERE ранга вместе с параметрами; rowid — в row_id."""
+        if rank == RANK_TITLE:
+            # Заголовки ищутся по отдельной маленькой таблице, а основная
+            # подключается по rowid только ради подсветки текста.
+            return (
+                f'FROM {TITLE_TABLE} JOIN {SEARCH_TABLE} '
+                f'ON {SEARCH_TABLE}.rowid = {TITLE_TABLE}.rowid '
+                f'JOIN {Post._meta.db_table} p ON p.id = {TITLE_TABLE}.rowid '
+                f'WHERE {TITLE_TABLE} MATCH %s AND {SEARCH_TABLE} MATCH %s',
+                [self.match, self.match],
+                f'{TITLE_TABLE}.rowid',
+            )
+        return (
+            f'FROM {SEARCH_TABLE} '
+            f'JOIN {Post._meta.db_table} p ON p.id = {SEARCH_TABLE}.rowid '
+            f'WHERE {SEARCH_TABLE} MATCH %s',
+            [f'({self.match}) NOT {{title}} : ({self.match})'],
+            f'{SEARCH_TABLE}.rowid',
+        )
+
+    def fetch_rank(self, rank, after_id, forward, limit):
+        """Строки ранга (id, ранг, заголовок, фрагмент) после after_id."""
+        source, params, row_id = self.rank_query(rank)
+        order = 'DESC' if forward else 'ASC'
+        seek = ''
+        if after_id is not None:
+            seek = f'AND {row_id} {"<" if forward else ">"} %s'
+            params.append(after_id)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT p.id, {rank}, '
+                f'highlight({SEARCH_TABLE}, 0, %s, %s), '
+                f'snippet({SEARCH_TABLE}, 1, %s, %s, %s, %s) '
+                f'{source} AND p.is_visible {seek} '
+                f'ORDER BY {row_id} {order} LIMIT %s',
+                [MARK_START, MARK_END, MARK_START, MARK_END, ELLIPSIS,
+                 SEARCH_SNIPPET_TOKENS, *params, limit]
+            )
+            return cursor.fetchall()
+
+    def fetch(self, values, forward, limit):
+        """Строки после ключа values, при необходимости из нескольких рангов.
+
+        При обходе назад строки идут в обратном порядке.
+        """
+        ranks = [RANK_TITLE, RANK_TEXT]
+        if not forward:
+            ranks.reverse()
+        if values is not None:
+            if values[0] not in ranks:
+                raise InvalidCursor(values)
+            ranks = ranks[ranks.index(values[0]):]
+        rows = []
+        for rank in ranks:
+            after_id = None
+            if values is not None and rank == values[0]:
+                after_id = values[1]
+            rows += self.fetch_rank(rank, after_id, forward,
+                                    limit - len(rows))
+            if len(rows) >= limit:
+                break
+        return rows
+
+    def load_posts(self, rows):
+        posts = Post.filtered.defer('text', 'text_html').in_bulk(
+            [row[0] for row in rows]
+        )
+        result = []
+        for post_id, rank, title, snippet in rows:
+            post = posts.get(post_id)
+            if post is None:
+                continue
+            post.search_rank = rank
+            post.search_title = mark(title)
+            post.search_snippet = mark(snippet)
+            result.append(post)
+        return result
+
+    def fallback_page(self, after, before):
+        """Поиск без FTS5: icontains по заголовку и тексту."""
+        words = self.query.split()
+        condition = models.Q()
+        for word in words:
+            condition &= (models.Q(title__icontains=word)
+                          | models.Q(text__icontains=word))
+        paginator = CursorPaginator(
+            Post.filtered.filter(condition), self.per_page
+        )
+        page = paginator.page(after=after, before=before)
+        for post in page:
+            post.search_title = post.title
+            post.search_snippet = post.excerpt
+        return page
+
+    def page(self, after=None, before=None):
+        if self.match is None:
+            return CursorPage([], self, False, False)
+        if not search_available():
+            return self.fallback_page(after, before)
+        if before is not None:
+            rows = self.fetch(self.decode_cursor(before), False,
+                              self.per_page + 1)
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            return CursorPage(self.load_posts(rows), self, True, has_previous)
+        values = None if after is None else self.decode_cursor(after)
+        rows = self.fetch(values, True, self.per_page + 1)
+        has_next = len(rows) > self.per_page
+        return CursorPage(self.load_posts(rows[:self.per_page]), self,
+                          has_next, after is not None)
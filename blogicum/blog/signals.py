@@ -0,0 +1,101 @@
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from blog.cache import COMMENTS, POSTS, USERS, bump_generation
+from blog.models import Category, Comment, Post, User
+from blog.scheduler import sync_category_posts
+from blog.search import index_post, remove_post
+
+
+def change_comment_count(post_id, delta):
+    """Атомарно изменить счётчик комментариев публикации."""
+    posts = Post.objects.filter(pk=post_id)
+    if delta < 0:
+        posts = posts.filter(comment_count__gte=-delta)
+    posts.update(comment_count=F('comment_count') + delta)
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_publication(sender, instance, update_fields=None,
+                                 **kwargs):
+    """Запомнить публикацию комментария до его изменения."""
+    instance._old_publication_id = None
+    if update_fields is not None and 'publication' not in update_fields:
+        return
+    if instance.pk is not None:
+        instance._old_publication_id = (
+            Comment.objects.filter(pk=instance.pk)
+            .values_list('publication_id', flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_count_on_save(sender, instance, created, **kwargs):
+    """Учесть новый комментарий или его перенос к другой публикации."""
+    old_publication_id = getattr(instance, '_old_publication_id', None)
+    if created:
+        change_comment_count(instance.publication_id, 1)
+    elif old_publication_id not in (None, instance.publication_id):
+        change_comment_count(old_publication_id, -1)
+        change_comment_count(instance.publication_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def update_comment_count_on_delete(sender, instance, **kwargs):
+    """Учесть удалённый комментарий, в том числе при каскадном удалении."""
+    change_comment_count(instance.publication_id, -1)
+
+
+@receiver(post_save, sender=Category)
+def update_category_posts_visibility(sender, instance, **kwargs):
+    """Скрыть или открыть публикации категории вместе с ней."""
+    sync_category_posts(instance)
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    """Скрыть публикации удаляемой категории: они останутся без неё."""
+    Post.objects.filter(category=instance, is_visible=True).update(
+        is_visible=False
+    )
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    """Переиндексировать публикацию, если изменились заголовок или текст."""
+    if update_fields is None or {'title', 'text'} & set(update_fields):
+        index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    remove_post(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_post_caches(sender, **kwargs):
+    """Сбросить кешированные выборки публикаций после изменений."""
+    bump_generation(POSTS)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def reset_comment_caches(sender, **kwargs):
+    """Сбросить выборки, в которых есть комментарии или их счётчик."""
+    bump_generation(COMMENTS)
+
+
+@receiver(post_save, sender=User)
+def reset_user_caches(sender, update_fields=None, **kwargs):
+    """Сбросить выборки с данными пользователей.
+
+    Сохранение только last_login при входе кеш не трогает.
+    """
+    if update_fields is None or set(update_fields) - {'last_login'}:
+        bump_generation(USERS)
@@ -0,0 +1,13 @@
+// Догрузка комментариев: ссылка «Показать ещё» заменяется фрагментом
+// из data-load-more. Без JavaScript ссылка ведёт на страницу публикации
+// со следующими комментариями.
+document.addEventListener('click', function (event) {
+  const link = event.target.closest('[data-load-more]');
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  fetch(link.dataset.loadMore)
+    .then((response) => response.text())
+    .then((html) => { link.outerHTML = html; });
+});
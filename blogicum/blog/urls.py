@@ -5,6 +5,10 @@ from blog import views
 app_name = 'blog'
 
 posts_urls = [
+    path('export/',
+         views.PostExportView.as_view(),
+         name='export_posts'),
+
     path('<int:post_id>/',
          views.PostDetailView.as_view(),
          name='post_detail'),
@@ -25,6 +29,10 @@ posts_urls = [
          views.CommentCreateView.as_view(),
          name='add_comment'),
 
+    path('<int:post_id>/comments/more/',
+         views.CommentListView.as_view(),
+         name='comments'),
+
     path('<int:post_id>/comments/<int:comment_id>/edit_comment/',
          views.CommentUpdateView.as_view(),
          name='edit_comment'),
@@ -49,6 +57,7 @@ urlpatterns = [
          name='index'),
     path('posts/', include(posts_urls)),
     path('profile/', include(profiles_urls)),
+    path('search/', views.SearchView.as_view(), name='search'),
     path('category/<slug:category_slug>/',
          views.CategoryDetailView.as_view(),
          name='category_posts'),
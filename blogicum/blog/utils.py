@@ -0,0 +1,31 @@
+"""Вспомогательные функции для обработки текста публикаций."""
+from math import ceil
+
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+from blog.constants import EXCERPT_WORDS, WORDS_PER_MINUTE
+
+
+def make_excerpt(text):
+    """Анонс текста, совпадающий с фильтром truncatewords."""
+    return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+
+
+def count_words(text):
+    """Количество слов в тексте."""
+    return len(text.split())
+
+
+def reading_minutes(word_count):
+    """Время чтения в минутах, не меньше одной."""
+    return max(1, ceil(word_count / WORDS_PER_MINUTE))
+
+
+def render_text(text):
+    """HTML текста: экранирование и переносы строк как у linebreaksbr.
+
+    При изменении правил отрисовки нужно увеличить
+    TEXT_RENDERER_VERSION, чтобы сохранённый HTML пересчитался.
+    """
+    return linebreaksbr(text, autoescape=True)
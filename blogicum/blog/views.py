@@ -1,14 +1,27 @@
+from http import HTTPStatus
 from typing import Any
-
-from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.shortcuts import get_object_or_404
+from urllib.parse import urlencode
+
+from django.contrib.auth.mixins import (LoginRequiredMixin,
+                                        UserPassesTestMixin)
+from django.db.models import Count
+from django.http import (Http404, HttpResponseBadRequest,
+                         StreamingHttpResponse)
+from django.shortcuts import get_object_or_404, render
 from django.urls import reverse
-from django.views.generic import CreateView, DeleteView, DetailView, UpdateView
+from django.views.generic import (CreateView, DeleteView, DetailView,
+                                  TemplateView, UpdateView, View)
 
+from blog.constants import POST_COUNT
+from blog.export import EXPORT_FORMATS, iter_export
 from blog.forms import CommentForm, PostForm, UserUpdateForm
-from blog.mixins import (CommentCrudMixin, PostAccessEditMixin, PostCrudMixin,
+from blog.managers import published_filter, visible_filter
+from blog.mixins import (CommentAccessEditMixin, CommentCrudMixin,
+                         CommentPageMixin, PostAccessEditMixin, PostCrudMixin,
                          PostViewMixin)
 from blog.models import Category, Post, User
+from blog.paginators import InvalidCursor
+from blog.search import SearchPaginator
 
 
 class CategoryDetailView(PostViewMixin):
@@ -16,6 +29,7 @@ class CategoryDetailView(PostViewMixin):
 
     template_name = 'blog/category.html'
     category = None
+    cache_rows = True
 
     def set_category(self):
         self.category = get_object_or_404(Category,
@@ -25,7 +39,10 @@ class CategoryDetailView(PostViewMixin):
     def get_queryset(self):
         self.set_category()
         qs = Post.filtered.filter(category=self.category)
-        return self.get_comment_count(qs)
+        return self.get_ordered(qs)
+
+    def get_count_signature(self):
+        return ('category', self.category.pk)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -37,33 +54,57 @@ class PostListView(PostViewMixin):
     """View-класс списка публикаций."""
 
     template_name = 'blog/index.html'
+    cache_rows = True
 
     def get_queryset(self):
         """Получить отфильтрованный QS из модели Post."""
         qs = Post.filtered.all()
-        return self.get_comment_count(qs)
+        return self.get_ordered(qs)
 
+    def get_count_signature(self):
+        return ('index',)
 
-class PostDetailView(DetailView):
+
+class PostDetailView(CommentPageMixin, DetailView):
     """View-класс для просмотра публикации."""
 
     model = Post
     pk_url_kwarg = 'post_id'
     template_name = 'blog/detail.html'
 
-    def get_object(self, *args, **kwargs):
-        obj = super().get_object(*args, **kwargs)
-        if obj.author != self.request.user:
-            obj = get_object_or_404(Post.filtered.all(),
-                                    id=self.kwargs['post_id']
-                                    )
-        return obj
+    def get_queryset(self):
+        """Автор видит свою публикацию всегда, остальные — только видимую."""
+        return Post.objects.select_related(
+            'author', 'category', 'location'
+        ).filter(visible_filter(self.request.user))
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = (self.object.comments.select_related('author'))
+        # Без JavaScript ссылка «Показать ещё» ведёт сюда с курсором.
+        context['comments'] = self.get_comment_page(
+            self.object.id, after=self.request.GET.get('comments_after')
+        )
+
+        return context
+
+
+class CommentListView(CommentPageMixin, TemplateView):
+    """View-класс для догрузки комментариев к публикации."""
 
+    template_name = 'includes/comment_list.html'
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        post_id = self.kwargs['post_id']
+        if not Post.objects.filter(
+            visible_filter(self.request.user), pk=post_id
+        ).exists():
+            raise Http404('Публикация не найдена.')
+        context['post_id'] = post_id
+        context['comments'] = self.get_comment_page(
+            post_id, after=self.request.GET.get('after')
+        )
         return context
 
 
@@ -90,42 +131,49 @@ class PostDeleteView(PostCrudMixin, PostAccessEditMixin, DeleteView):
 class CommentCreateView(CommentCrudMixin, CreateView):
     """View-класс для добавления комментария к публикации."""
 
-    publication = None
     form_class = CommentForm
+    fragment_template_name = 'includes/comment.html'
+
+    def check_publication(self):
+        """Проверить, что пост существует и виден, не загружая его."""
+        if not Post.objects.filter(
+            visible_filter(self.request.user), pk=self.kwargs['post_id']
+        ).exists():
+            raise Http404('Публикация не найдена.')
+
+    def wants_fragment(self):
+        """Клиент просит вернуть только HTML нового комментария."""
+        return ('fragment' in self.request.GET
+                or self.request.headers.get('X-Requested-With')
+                == 'XMLHttpRequest')
 
     def form_valid(self, form):
-        self.publication = get_object_or_404(Post, pk=self.kwargs['post_id'])
+        self.check_publication()
         form.instance.author = self.request.user
-        form.instance.publication = self.publication
-        return super().form_valid(form)
+        form.instance.publication_id = self.kwargs['post_id']
+        if not self.wants_fragment():
+            return super().form_valid(form)
+        self.object = form.save()
+        return render(self.request, self.fragment_template_name,
+                      {'comment': self.object}, status=HTTPStatus.CREATED)
 
 
 class CommentUpdateView(
-    CommentCrudMixin, UserPassesTestMixin, UpdateView
+    CommentCrudMixin, CommentAccessEditMixin, UpdateView
 ):
     """View-класс для редактирования комментария к публикации."""
 
     form_class = CommentForm
-    pk_url_kwarg = 'comment_id'
     template_name = 'blog/comment.html'
 
-    def test_func(self):
-        object = self.get_object()
-        return object.author == self.request.user
-
 
 class CommentDeleteView(
-    CommentCrudMixin, UserPassesTestMixin, DeleteView
+    CommentCrudMixin, CommentAccessEditMixin, DeleteView
 ):
     """View-класс для удаления комментария к публикации."""
 
-    pk_url_kwarg = 'comment_id'
     template_name = 'blog/comment.html'
 
-    def test_func(self):
-        object = self.get_object()
-        return object.author_id == self.request.user.id
-
     def get_context_data(self, **kwargs: Any):
         return None
 
@@ -149,19 +197,92 @@ class ProfileDetailView(PostViewMixin):
     """View-класс для просмотра профиля пользователя по категориям."""
 
     template_name = 'blog/profile.html'
+    author = None
+
+    def is_owner(self):
+        return self.kwargs['username'] == self.request.user.username
+
+    def get_author(self):
+        """Автор профиля вместе с числом его публикаций одним запросом."""
+        if self.author is None:
+            posts = None if self.is_owner() else published_filter('posts__')
+            users = User.objects.annotate(
+                post_total=Count('posts', filter=posts)
+            )
+            self.author = get_object_or_404(
+                users, username=self.kwargs['username']
+            )
+        return self.author
 
     def get_queryset(self):
-        author = get_object_or_404(User, username=self.kwargs['username'])
-        qs = Post.filtered.filter(author=author)
-        if author.username == self.request.user.username:
-            qs = Post.objects.select_related(
-                'author', 'category', 'location'
-            ).filter(author=author)
+        qs = Post.objects.select_related(
+            'author', 'category', 'location'
+        ).filter(author=self.get_author())
+        if not self.is_owner():
+            qs = qs.filter(published_filter())
+        return self.get_ordered(qs)
+
+    def get_count_signature(self):
+        visibility = 'all' if self.is_owner() else 'published'
+        return ('profile', self.get_author().pk, visibility)
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        paginator = super().get_paginator(queryset, per_page, **kwargs)
+        paginator.store_count(self.get_author().post_total)
+        return paginator
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['profile'] = self.get_author()
+        return context
+
+
+class SearchView(TemplateView):
+    """Полнотекстовый поиск по видимым публикациям.
 
-        return self.get_comment_count(qs)
+    Релевантность не считается: выдача делится только на два ранга —
+    совпадения в заголовке, затем в тексте, — а внутри ранга идёт по
+    убыванию id (см. blog.search).
+    """
+
+    template_name = 'blog/search.html'
+    paginate_by = POST_COUNT
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        profile = get_object_or_404(User, username=self.kwargs['username'])
-        context['profile'] = profile
+        query = self.request.GET.get('q', '').strip()
+        paginator = SearchPaginator(query, self.paginate_by)
+        try:
+            page = paginator.page(after=self.request.GET.get('after'),
+                                  before=self.request.GET.get('before'))
+        except InvalidCursor:
+            raise Http404('Неверный курсор страницы.')
+        context['query'] = query
+        context['page_obj'] = page
+        context['page_params'] = urlencode({'q': query})
         return context
+
+
+class PostExportView(UserPassesTestMixin, View):
+    """Потоковая выгрузка опубликованных публикаций для персонала.
+
+    Формат задаётся параметром ?format=jsonl или ?format=csv.
+    """
+
+    raise_exception = True
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('format', 'jsonl')
+        if export_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest('Неизвестный формат выгрузки.')
+        response = StreamingHttpResponse(
+            iter_export(export_format),
+            content_type=EXPORT_FORMATS[export_format]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="posts.{export_format}"'
+        )
+        return response
@@ -1,3 +1,4 @@
+import tempfile
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -22,6 +23,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -105,3 +107,50 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
+
+# Кеш должен быть общим для всех процессов сервера: выборки сбрасываются
+# сменой поколения в кеше (blog.cache), а LocMemCache у каждого процесса
+# свой, и остальные процессы отдавали бы устаревшие данные до истечения
+# COUNT_CACHE_TIMEOUT. Файловый кеш общий для процессов одной машины;
+# если серверов несколько, нужен Redis или Memcached.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': Path(tempfile.gettempdir()) / 'blogicum-cache',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
+
+BLOG_CURSOR_PAGINATION = False
+
+# Длина интервала в секундах, в течение которого страницы лент
+# отдаются из кеша; None отключает кеширование записей.
+BLOG_LIST_CACHE_GRANULARITY = None
+
+# Наибольшее число SQL-запросов на один ответ view; при превышении
+# QueryBudgetMiddleware пишет предупреждение в лог, а в строгом режиме
+# (включается в тестах) выбрасывает исключение.
+QUERY_BUDGETS = {
+    'blog:index': 5,
+    'blog:category_posts': 6,
+    'blog:profile': 5,
+    'blog:post_detail': 5,
+    'blog:comments': 5,
+    'blog:add_comment': 10,
+    'blog:create_post': 12,
+    'blog:edit_post': 12,
+    'blog:delete_post': 13,
+    'blog:edit_comment': 8,
+    'blog:delete_comment': 8,
+    'blog:edit_profile': 6,
+    'blog:export_posts': 3,
+    'blog:search': 5,
+}
+
+QUERY_BUDGET_STRICT = False
+
+# Каталог, куда процессы сбрасывают метрики для эндпоинта /metrics/,
+# и наименьший интервал между сбросами в секундах.
+METRICS_DIR = Path(tempfile.gettempdir()) / 'blogicum-metrics'
+
+METRICS_FLUSH_INTERVAL = 5
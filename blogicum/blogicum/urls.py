@@ -5,6 +5,7 @@ from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path, reverse_lazy
 from django.views.generic.edit import CreateView
 
+from blog.admin_mixins import CachedAutocompleteJsonView
 from core import views
 
 handler404 = 'pages.views.page_not_found'
@@ -12,8 +13,14 @@ handler500 = 'pages.views.server_error'
 
 urlpatterns = [
     path('', include('blog.urls', namespace='blog')),
+    path('admin/lookup/',
+         admin.site.admin_view(
+             CachedAutocompleteJsonView.as_view(admin_site=admin.site)
+         ),
+         name='admin_lookup'),
     path('admin/', admin.site.urls),
     path('pages/', include('pages.urls', namespace='pages')),
+    path('metrics/', views.metrics_view, name='metrics'),
     path('auth/', include('django.contrib.auth.urls')),
     path('auth/login', views.CustomLoginView.as_view(), name='login'),
     path('auth/registration/',
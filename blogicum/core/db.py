@@ -0,0 +1,116 @@
+"""Приёмы для массовой загрузки данных в базу."""
+from contextlib import contextmanager
+
+from django.db import connection
+from django.db.models.constants import OnConflict
+
+# Размер страничного кеша SQLite на время загрузки, в килобайтах.
+BULK_LOAD_CACHE_KB = 256 * 1024
+
+
+class DeferredIndexes:
+    """Снятые на время загрузки индексы таблиц.
+
+    Уникальные индексы не снимаются: без них загрузка не заметила бы
+    нарушение уникальности, а ошибка при пересоздании индекса пришла
+    бы слишком поздно.
+    """
+
+    def __init__(self):
+        self.tables = set()
+        self.indexes = []
+
+    def defer(self, *models):
+        """Снять индексы таблиц моделей, если это ещё не сделано."""
+        if connection.vendor != 'sqlite':
+            return
+        tables = [
+            model._meta.db_table for model in models
+            if model._meta.db_table not in self.tables
+        ]
+        if not tables:
+            return
+        self.tables.update(tables)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'index' "
+                'AND sql IS NOT NULL AND sql NOT LIKE %%s '
+                'AND tbl_name IN (%s)' % ', '.join(['%s'] * len(tables)),
+                ['CREATE UNIQUE%', *tables]
+            )
+            indexes = cursor.fetchall()
+            for name, _ in indexes:
+                cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+        self.indexes.extend(indexes)
+
+    def restore(self):
+        """Построить снятые индексы заново.
+
+        Индекс, снятый в откатившейся транзакции, уже на месте и
+        пропускается.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            )
+            existing = {name for name, in cursor.fetchall()}
+            while self.indexes:
+                name, sql = self.indexes.pop()
+                if name not in existing:
+                    cursor.execute(sql)
+        self.tables.clear()
+
+
+@contextmanager
+def bulk_load(*models):
+    """Подготовить таблицы моделей к массовой вставке.
+
+    Вторичные индексы снимаются и строятся заново после вставки: по
+    готовой таблице это быстрее, чем обновлять индекс на каждой строке.
+    Сейчас поддерживается SQLite: индексы пересоздаются из их исходного
+    SQL, включая частичные условия, а страничный кеш на время загрузки
+    увеличивается. На других СУБД таблицы не трогаются.
+    Менеджер возвращает DeferredIndexes: таблицы, которые становятся
+    известны по ходу загрузки, добавляются через его defer().
+    Вызывать внутри transaction.atomic(), чтобы при ошибке вернулись
+    и данные, и индексы; при загрузке несколькими транзакциями индексы
+    строятся заново и после ошибки.
+    """
+    deferred = DeferredIndexes()
+    if connection.vendor != 'sqlite':
+        yield deferred
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA cache_size')
+        cache_size = cursor.fetchone()[0]
+        cursor.execute(f'PRAGMA cache_size = -{BULK_LOAD_CACHE_KB}')
+    deferred.defer(*models)
+    try:
+        yield deferred
+    finally:
+        deferred.restore()
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA cache_size = {cache_size}')
+
+
+def raw_upsert(model, objs):
+    """Вставить объекты как есть, заменив строки с теми же первичными ключами.
+
+    bulk_create(update_conflicts=True) не годится для загрузки выгрузок:
+    он всегда вызывает pre_save полей, и даты auto_now_add заменились бы
+    текущим временем. Поэтому здесь вызывается приватный QuerySet._insert,
+    тот же, что внутри bulk_create, но с raw=True, как в save_base при
+    loaddata. Его сигнатура (raw, on_conflict, update_fields,
+    unique_fields) проверена на Django 4.1–4.2; при обновлении Django её
+    нужно сверить, об этом напомнит тест test_raw_upsert_signature.
+    """
+    opts = model._meta
+    fields = opts.local_concrete_fields
+    update_fields = [field for field in fields if not field.primary_key]
+    step = connection.ops.bulk_batch_size(fields, objs) or len(objs)
+    for start in range(0, len(objs), step):
+        model._base_manager._insert(
+            objs[start:start + step], fields=fields, raw=True,
+            on_conflict=OnConflict.UPDATE, update_fields=update_fields,
+            unique_fields=[opts.pk],
+        )
@@ -0,0 +1,360 @@
+"""Метрики запросов, собираемые в памяти процесса.
+
+Каждый процесс копит гистограммы и счётчики в registry и периодически
+сбрасывает их в свой файл в каталоге METRICS_DIR. Эндпоинт метрик
+складывает файлы всех процессов хоста и отдаёт сумму в текстовом
+формате Prometheus.
+"""
+import bisect
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+QUERY_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PAGE_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 500, 1000)
+
+METRIC_PREFIX = 'blogicum_'
+# Файл с суммой метрик завершившихся процессов.
+AGGREGATE_FILE = 'aggregate.json'
+PROCESS_FILE_RE = re.compile(r'(\d+)-\d+\.json')
+CACHE_REQUESTS = 'cache_requests_total'
+
+
+class Histogram:
+    """Гистограмма с фиксированными верхними границами корзин.
+
+    counts[i] — число наблюдений не больше buckets[i] и больше
+    предыдущей границы; последний элемент — наблюдения больше всех границ.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def as_dict(self):
+        return {
+            'buckets': list(self.buckets),
+            'counts': list(self.counts),
+            'sum': self.sum,
+            'count': self.count,
+        }
+
+
+class Registry:
+    """Гистограммы и счётчики по имени метрики и значениям меток.
+
+    Метки передаются кортежем пар (метка, значение).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, name, labels, value, buckets):
+        """Добавить наблюдение value в гистограмму."""
+        with self._lock:
+            histogram = self._histograms.get((name, labels))
+            if histogram is None:
+                histogram = self._histograms[(name, labels)] = Histogram(
+                    buckets
+                )
+            histogram.observe(value)
+
+    def inc(self, name, labels, amount=1):
+        """Увеличить счётчик."""
+        with self._lock:
+            key = (name, labels)
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def get(self, name, labels):
+        return self._histograms.get((name, labels))
+
+    def get_counter(self, name, labels):
+        return self._counters.get((name, labels), 0)
+
+    def snapshot(self):
+        """Копия всех гистограмм: {(имя, метки): словарь гистограммы}."""
+        with self._lock:
+            return {
+                key: histogram.as_dict()
+                for key, histogram in self._histograms.items()
+            }
+
+    def dump(self):
+        """Гистограммы и счётчики в виде, пригодном для JSON."""
+        with self._lock:
+            histograms = [
+                {'name': name, 'labels': labels, **histogram.as_dict()}
+                for (name, labels), histogram in self._histograms.items()
+            ]
+            counters = [
+                {'name': name, 'labels': labels, 'value': value}
+                for (name, labels), value in self._counters.items()
+            ]
+        return {'histograms': histograms, 'counters': counters}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+registry = Registry()
+
+
+def record_cache(cache_name, hit):
+    """Учесть попадание или промах кеша cache_name."""
+    registry.inc(CACHE_REQUESTS, (
+        ('cache', cache_name), ('result', 'hit' if hit else 'miss')
+    ))
+
+
+def get_metrics_dir():
+    return Path(getattr(
+        settings, 'METRICS_DIR',
+        Path(tempfile.gettempdir()) / 'blogicum-metrics'
+    ))
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge_metrics(histograms, counters, data):
+    """Добавить метрики data из файла к суммам histograms и counters."""
+    for item in data['histograms']:
+        key = (item['name'], tuple(map(tuple, item['labels'])))
+        merged = histograms.setdefault(key, {
+            'buckets': item['buckets'],
+            'counts': [0] * len(item['counts']),
+            'sum': 0,
+            'count': 0,
+        })
+        if merged['buckets'] != item['buckets']:
+            continue
+        merged['counts'] = [
+            total + count
+            for total, count in zip(merged['counts'], item['counts'])
+        ]
+        merged['sum'] += item['sum']
+        merged['count'] += item['count']
+    for item in data['counters']:
+        key = (item['name'], tuple(map(tuple, item['labels'])))
+        counters[key] = counters.get(key, 0) + item['value']
+
+
+def dump_metrics(histograms, counters):
+    """Суммы метрик в формате файла процесса."""
+    return {
+        'histograms': [
+            {'name': name, 'labels': labels, **histogram}
+            for (name, labels), histogram in histograms.items()
+        ],
+        'counters': [
+            {'name': name, 'labels': labels, 'value': value}
+            for (name, labels), value in counters.items()
+        ],
+    }
+
+
+def read_metrics(path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+class FileStore:
+    """Файлы с метриками процессов одного хоста.
+
+    Процесс пишет полный снимок своих метрик в собственный файл
+    {pid}-{время запуска}.json, заменяя его атомарно, поэтому читатель
+    никогда не видит файл наполовину записанным. При чтении файлы
+    завершившихся процессов добавляются к AGGREGATE_FILE и удаляются:
+    их счётчики остаются в сумме, а число файлов не растёт с каждым
+    перезапуском воркеров.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        started = int(time.time() * 1000)
+        self.path = self.directory / f'{os.getpid()}-{started}.json'
+        self.flushed_at = 0.0
+
+    def write_file(self, path, data):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as tmp:
+            json.dump(data, tmp)
+        os.replace(tmp_path, path)
+
+    def write(self, data):
+        self.write_file(self.path, data)
+        self.flushed_at = time.monotonic()
+
+    def dead_process_files(self):
+        paths = []
+        for path in self.directory.glob('*.json'):
+            match = PROCESS_FILE_RE.fullmatch(path.name)
+            if match is None:
+                continue
+            pid = int(match[1])
+            if pid != os.getpid() and not process_alive(pid):
+                paths.append(path)
+        return paths
+
+    def compact(self):
+        """Перенести метрики завершившихся процессов в AGGREGATE_FILE.
+
+        Читатели работают под блокировкой файла, чтобы один и тот же
+        файл не попал в сумму дважды. Без fcntl файлы не сжимаются.
+        """
+        if fcntl is None or not self.directory.exists():
+            return
+        with open(self.directory / '.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            dead = self.dead_process_files()
+            if not dead:
+                return
+            histograms = {}
+            counters = {}
+            aggregate = self.directory / AGGREGATE_FILE
+            for path in (aggregate, *dead):
+                data = read_metrics(path) if path.exists() else None
+                if data is not None:
+                    merge_metrics(histograms, counters, data)
+            self.write_file(aggregate, dump_metrics(histograms, counters))
+            for path in dead:
+                path.unlink(missing_ok=True)
+
+    def read_all(self):
+        """Сумма метрик всех процессов."""
+        self.compact()
+        histograms = {}
+        counters = {}
+        for path in self.directory.glob('*.json'):
+            data = read_metrics(path)
+            if data is not None:
+                merge_metrics(histograms, counters, data)
+        return histograms, counters
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Файл метрик текущего процесса; создаётся заново после fork."""
+    global _store
+    directory = get_metrics_dir()
+    with _store_lock:
+        if (_store is None or _store.directory != directory
+                or not _store.path.name.startswith(f'{os.getpid()}-')):
+            _store = FileStore(directory)
+        return _store
+
+
+def flush(force=False):
+    """Записать метрики процесса в файл, если пора."""
+    store = get_store()
+    interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+    if force or time.monotonic() - store.flushed_at >= interval:
+        store.write(registry.dump())
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('"', r'\"')
+         .replace('\n', r'\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def group_by_name(items):
+    grouped = {}
+    for (name, labels), value in sorted(items.items()):
+        grouped.setdefault(name, []).append((labels, value))
+    return grouped.items()
+
+
+def render_histograms(histograms):
+    for name, series in group_by_name(histograms):
+        metric = METRIC_PREFIX + name
+        yield f'# TYPE {metric} histogram'
+        for labels, histogram in series:
+            cumulative = 0
+            bounds = [*histogram['buckets'], '+Inf']
+            for bound, count in zip(bounds, histogram['counts']):
+                cumulative += count
+                bucket_labels = format_labels((*labels, ('le', bound)))
+                yield f'{metric}_bucket{bucket_labels} {cumulative}'
+            yield f'{metric}_sum{format_labels(labels)} {histogram["sum"]}'
+            yield (f'{metric}_count{format_labels(labels)} '
+                   f'{histogram["count"]}')
+
+
+def render_counters(counters):
+    for name, series in group_by_name(counters):
+        metric = METRIC_PREFIX + name
+        yield f'# TYPE {metric} counter'
+        for labels, value in series:
+            yield f'{metric}{format_labels(labels)} {value}'
+
+
+def render_cache_hit_ratios(counters):
+    """Доля попаданий по каждому кешу из счётчика CACHE_REQUESTS."""
+    ratios = {}
+    for (name, labels), value in counters.items():
+        if name != CACHE_REQUESTS:
+            continue
+        labels = dict(labels)
+        hits, total = ratios.get(labels['cache'], (0, 0))
+        if labels['result'] == 'hit':
+            hits += value
+        ratios[labels['cache']] = (hits, total + value)
+    if not ratios:
+        return
+    metric = METRIC_PREFIX + 'cache_hit_ratio'
+    yield f'# TYPE {metric} gauge'
+    for cache_name, (hits, total) in sorted(ratios.items()):
+        labels = format_labels((('cache', cache_name),))
+        yield f'{metric}{labels} {hits / total}'
+
+
+def render_prometheus(histograms, counters):
+    """Метрики в текстовом формате Prometheus 0.0.4."""
+    lines = [
+        *render_histograms(histograms),
+        *render_counters(counters),
+        *render_cache_hit_ratios(counters),
+    ]
+    return '\n'.join(lines) + '\n'
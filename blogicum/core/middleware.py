@@ -0,0 +1,113 @@
+import logging
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+from core import metrics
+from core.metrics import QUERY_BUCKETS, TIME_BUCKETS, registry
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """View выполнил больше SQL-запросов, чем разрешено бюджетом."""
+
+
+class RequestStats:
+    """Счётчики одного запроса; подключается как execute_wrapper."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_time += perf_counter() - start
+
+
+class QueryBudgetMiddleware:
+    """Собирает метрики каждого view и проверяет бюджет запросов.
+
+    Для view с именем из resolver_match записываются гистограммы числа
+    SQL-запросов, времени SQL, отрисовки шаблона и всего ответа.
+    Время ответа пишется и с разбивкой по коду статуса, а метрики
+    периодически сбрасываются в файл процесса для эндпоинта метрик.
+    Бюджеты задаются настройкой QUERY_BUDGETS вида
+    {'blog:index': 5}; при превышении пишется предупреждение в лог,
+    а с QUERY_BUDGET_STRICT = True выбрасывается QueryBudgetExceeded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = request.query_stats = RequestStats()
+        start = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        wall_time = perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        if match is not None:
+            self.record(match.view_name, stats, wall_time)
+            registry.observe(
+                'http_request_seconds',
+                (('view', match.view_name),
+                 ('status', str(response.status_code))),
+                wall_time, TIME_BUCKETS
+            )
+            self.flush()
+            self.check_budget(match.view_name, stats)
+        return response
+
+    def process_template_response(self, request, response):
+        """Засечь время отрисовки шаблона, которая идёт после view."""
+        render = response.render
+        stats = request.query_stats
+
+        def timed_render():
+            start = perf_counter()
+            try:
+                return render()
+            finally:
+                stats.template_time += perf_counter() - start
+
+        response.render = timed_render
+        return response
+
+    def record(self, view_name, stats, wall_time):
+        labels = (('view', view_name),)
+        registry.observe('view_queries', labels, stats.queries,
+                         QUERY_BUCKETS)
+        registry.observe('view_sql_seconds', labels, stats.sql_time,
+                         TIME_BUCKETS)
+        registry.observe('view_template_seconds', labels,
+                         stats.template_time, TIME_BUCKETS)
+        registry.observe('view_wall_seconds', labels, wall_time,
+                         TIME_BUCKETS)
+
+    def flush(self):
+        """Сбросить метрики процесса в файл; ошибка не ломает ответ."""
+        try:
+            metrics.flush()
+        except OSError:
+            logger.exception('Не удалось записать метрики')
+
+    def check_budget(self, view_name, stats):
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(view_name)
+        if budget is None or stats.queries <= budget:
+            return
+        message = (f'{view_name}: {stats.queries} SQL-запросов '
+                   f'при бюджете {budget}')
+        if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -1,9 +1,30 @@
+from django.conf import settings
 from django.contrib.auth.views import LoginView
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
 from django.urls import reverse
 
+from core import metrics
+
 
 class CustomLoginView(LoginView):
     """Кастомный LoginView"""
 
     def get_success_url(self):
         return reverse('blog:profile', kwargs={'username': self.request.user})
+
+
+def metrics_view(request):
+    """Метрики всех процессов хоста в формате Prometheus.
+
+    Доступны персоналу и адресам из INTERNAL_IPS.
+    """
+    if not (request.user.is_staff
+            or request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS):
+        raise PermissionDenied
+    metrics.flush(force=True)
+    histograms, counters = metrics.get_store().read_all()
+    return HttpResponse(
+        metrics.render_prometheus(histograms, counters),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
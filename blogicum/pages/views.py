@@ -3,11 +3,11 @@ from django.views.generic import TemplateView
 
 
 class AboutPage(TemplateView):
-    template_name = 'pages/about'
+    template_name = 'pages/about.html'
 
 
 class RulesPage(TemplateView):
-    template_name = 'pages/about'
+    template_name = 'pages/rules.html'
 
 
 def csrf_failure(request, reason=''):
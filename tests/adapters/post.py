@@ -33,6 +33,12 @@ class PostModelAdapter(StudentModelAdapter):
             "author",
             "category",
             "location",
+            "comment_count",
+            "excerpt",
+            "word_count",
+            "text_html",
+            "text_html_version",
+            "is_visible",
             "refresh_from_db",
         ]
 
@@ -0,0 +1,70 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+LOOKUP = {
+    "app_label": "blog",
+    "model_name": "post",
+    "field_name": "category",
+}
+
+
+def count_changelist_queries(admin_client):
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get("/admin/blog/post/")
+    assert response.status_code == HTTPStatus.OK
+    return len(queries), response.content.decode("utf-8")
+
+
+def test_changelist_queries_do_not_grow(
+    admin_client, mixer, user, published_category, published_location
+):
+    def add_posts(count):
+        mixer.cycle(count).blend(
+            "blog.Post", author=user, category=published_category,
+            location=published_location,
+        )
+
+    add_posts(1)
+    few, _ = count_changelist_queries(admin_client)
+    add_posts(10)
+    many, content = count_changelist_queries(admin_client)
+    assert many == few, (
+        "Убедитесь, что число запросов списка публикаций в админке не"
+        " зависит от числа строк с редактируемыми внешними ключами."
+    )
+    assert "/admin/lookup/" in content, (
+        "Убедитесь, что автор, местоположение и категория в списке"
+        " публикаций выбираются через автодополнение."
+    )
+    assert f">{published_category}</option>" in content
+
+
+def test_lookup_endpoint_is_cached(admin_client, mixer, published_category):
+    mixer.blend("blog.Category", title="Путешествия")
+    params = {**LOOKUP, "term": "пут"}
+    response = admin_client.get("/admin/lookup/", params)
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert [row["text"] for row in data["results"]] == ["Путешествия"], (
+        "Убедитесь, что эндпоинт автодополнения ищет категории по началу"
+        " названия."
+    )
+    with CaptureQueriesContext(connection) as queries:
+        again = admin_client.get("/admin/lookup/", params)
+    assert again.json() == data
+    assert not any("blog_category" in query["sql"] for query in queries), (
+        "Убедитесь, что повторный запрос автодополнения берётся из кеша."
+    )
+
+
+def test_lookup_endpoint_access(client, user_client):
+    response = client.get("/admin/lookup/", LOOKUP)
+    assert response.status_code == HTTPStatus.FOUND
+    assert user_client.get("/admin/lookup/", LOOKUP).status_code == (
+        HTTPStatus.FOUND
+    ), "Убедитесь, что эндпоинт автодополнения доступен только персоналу."
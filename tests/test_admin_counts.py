@@ -0,0 +1,89 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.admin import PostAdmin
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer, user, published_category, monkeypatch):
+    monkeypatch.setattr(PostAdmin, "count_limit", 3)
+    monkeypatch.setattr(PostAdmin, "list_per_page", 2)
+    return mixer.cycle(5).blend(
+        "blog.Post", author=user, category=published_category
+    )
+
+
+def get_changelist(admin_client, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get("/admin/blog/post/", params)
+    counts = [
+        query["sql"] for query in queries
+        if query["sql"].startswith("SELECT COUNT(*)")
+    ]
+    return response, counts
+
+
+def test_changelist_estimates_count(admin_client, posts):
+    response, counts = get_changelist(admin_client)
+    cl = response.context["cl"]
+    assert cl.paginator.count_is_estimate
+    assert cl.result_count == 4
+    assert len(counts) == 1 and "LIMIT" in counts[0], (
+        "Убедитесь, что список публикаций в админке считает записи не"
+        " дальше предела и не считает всю таблицу второй раз."
+    )
+    content = response.content.decode("utf-8")
+    assert "Публикации: больше 3" in content
+    assert "_exact_count=1" in content, (
+        "Убедитесь, что под списком есть ссылка на точный подсчёт."
+    )
+
+    response, counts = get_changelist(admin_client, p=3)
+    assert len(response.context["cl"].result_list) == 1, (
+        "Убедитесь, что страницы за пределом оценки доступны."
+    )
+
+
+def test_exact_count_on_demand(admin_client, posts):
+    response, counts = get_changelist(admin_client, _exact_count=1)
+    cl = response.context["cl"]
+    assert not cl.paginator.count_is_estimate
+    assert cl.result_count == 5, (
+        "Убедитесь, что параметр `_exact_count` включает точный подсчёт."
+    )
+    response, counts = get_changelist(admin_client)
+    assert response.context["cl"].result_count == 5
+    assert counts == [], (
+        "Убедитесь, что точное число записей берётся из кеша."
+    )
+
+
+def test_filtered_counts_are_cached(admin_client, posts):
+    params = {"is_published__exact": 1, "p": 3}
+    response, counts = get_changelist(admin_client, **params)
+    assert response.context["cl"].result_count == 5
+    response, counts = get_changelist(admin_client, **params)
+    assert counts == [], (
+        "Убедитесь, что число отфильтрованных записей кешируется."
+    )
+    response, counts = get_changelist(admin_client, is_published__exact=0)
+    assert response.context["cl"].result_count == 0
+    assert len(counts) == 1
+
+
+def test_comment_counts_follow_comments(admin_client, mixer, posts):
+    post = posts[0]
+    comments = mixer.cycle(2).blend(
+        "blog.Comment", publication=post, author=post.author
+    )
+    response = admin_client.get("/admin/blog/comment/", {"_exact_count": 1})
+    assert response.context["cl"].result_count == 2
+    comments[0].delete()
+    response = admin_client.get("/admin/blog/comment/", {"_exact_count": 1})
+    assert response.context["cl"].result_count == 1, (
+        "Убедитесь, что число комментариев в админке не берётся из кеша"
+        " после удаления комментария."
+    )
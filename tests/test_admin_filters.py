@@ -0,0 +1,103 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.admin_filters import FacetFieldListFilter
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def authors(mixer, published_category):
+    authors = []
+    for number, name in enumerate(("bunin", "kuprin", "andreev")):
+        author = mixer.blend(get_user_model(), username=name)
+        mixer.cycle(3 - number).blend(
+            "blog.Post", author=author, category=published_category
+        )
+        authors.append(author)
+    return authors
+
+
+def get_spec(response, field_path):
+    return next(
+        spec for spec in response.context["cl"].filter_specs
+        if getattr(spec, "field_path", None) == field_path
+    )
+
+
+def test_post_author_facets(admin_client, monkeypatch, authors):
+    bunin, kuprin, andreev = authors
+    monkeypatch.setattr(FacetFieldListFilter, "facet_limit", 2)
+    response = admin_client.get("/admin/blog/post/")
+    spec = get_spec(response, "author")
+    assert spec.lookup_choices == [
+        (bunin.pk, "bunin (3)"), (kuprin.pk, "kuprin (2)")
+    ], (
+        "Убедитесь, что фильтр по автору показывает самых частых авторов"
+        " с числом публикаций."
+    )
+    content = response.content.decode("utf-8")
+    assert 'data-field-name="author"' in content, (
+        "Убедитесь, что остальных авторов можно найти автодополнением."
+    )
+
+    response = admin_client.get(
+        "/admin/blog/post/", {"author__id__exact": andreev.pk}
+    )
+    assert (andreev.pk, "andreev") in get_spec(
+        response, "author"
+    ).lookup_choices, (
+        "Убедитесь, что выбранный автор виден в фильтре, даже если его нет"
+        " среди самых частых."
+    )
+    assert len(response.context["cl"].result_list) == 1
+    response = admin_client.get("/admin/blog/post/", {"author__id__exact": ""})
+    assert len(response.context["cl"].result_list) == 6, (
+        "Убедитесь, что очищенное поле поиска автора снимает фильтр."
+    )
+
+
+def test_facets_are_cached(admin_client, authors):
+    admin_client.get("/admin/blog/post/")
+    with CaptureQueriesContext(connection) as queries:
+        admin_client.get("/admin/blog/post/")
+    assert not any("GROUP BY" in query["sql"] for query in queries), (
+        "Убедитесь, что счётчики фильтра берутся из кеша."
+    )
+
+
+def test_comment_publication_facets(admin_client, mixer, authors):
+    bunin = authors[0]
+    post, other = bunin.posts.all()[:2]
+    mixer.cycle(2).blend("blog.Comment", publication=post, author=bunin)
+    mixer.blend("blog.Comment", publication=other, author=bunin)
+    response = admin_client.get("/admin/blog/comment/")
+    assert get_spec(response, "publication").lookup_choices == [
+        (post.pk, f"{post} (2)"), (other.pk, f"{other} (1)")
+    ], (
+        "Убедитесь, что фильтр комментариев по публикации показывает"
+        " публикации с числом комментариев."
+    )
+
+
+def test_comment_facets_follow_comments(admin_client, mixer, authors):
+    bunin = authors[0]
+    post, other = bunin.posts.all()[:2]
+    mixer.blend("blog.Comment", publication=post, author=bunin)
+    comment = mixer.blend("blog.Comment", publication=other, author=bunin)
+    admin_client.get("/admin/blog/comment/")
+    mixer.cycle(2).blend("blog.Comment", publication=other, author=bunin)
+    response = admin_client.get("/admin/blog/comment/")
+    assert get_spec(response, "publication").lookup_choices == [
+        (other.pk, f"{other} (3)"), (post.pk, f"{post} (1)")
+    ], (
+        "Убедитесь, что новые комментарии сразу учитываются в счётчиках"
+        " фильтра."
+    )
+    comment.delete()
+    response = admin_client.get("/admin/blog/comment/")
+    assert get_spec(response, "publication").lookup_choices == [
+        (other.pk, f"{other} (2)"), (post.pk, f"{post} (1)")
+    ]
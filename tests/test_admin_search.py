@@ -0,0 +1,70 @@
+import pytest
+from django.contrib.auth import get_user_model
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer, published_category, published_location):
+    author = mixer.blend(get_user_model(), username="Tolstoy")
+    other = mixer.blend(get_user_model(), username="chekhov")
+    dinner = mixer.blend(
+        "blog.Post", title="Обед у Морозовой", author=author,
+        category=published_category, location=published_location,
+    )
+    walk = mixer.blend(
+        "blog.Post", title="Прогулка", author=other,
+        category=published_category, location=None,
+    )
+    return dinner, walk
+
+
+def search(admin_client, model, query):
+    response = admin_client.get(f"/admin/blog/{model}/", {"q": query})
+    return set(response.context["cl"].result_list)
+
+
+def test_post_admin_search_modes(admin_client, posts):
+    dinner, walk = posts
+    assert search(admin_client, "post", "обед") == {dinner}, (
+        "Убедитесь, что поиск публикаций в админке ищет слова заголовка по"
+        " полнотекстовому индексу."
+    )
+    assert search(admin_client, "post", "морозов") == {dinner}
+    assert search(admin_client, "post", "tol") == {dinner}, (
+        "Убедитесь, что имя автора ищется по началу строки без учёта"
+        " регистра первой буквы."
+    )
+    assert search(admin_client, "post", "Chek") == {walk}
+    assert search(admin_client, "post", "TOLSTOY") == {dinner}
+    assert search(admin_client, "post", "cHEK") == {walk}, (
+        "Убедитесь, что в режиме prefix регистр введённой строки не важен."
+    )
+    assert search(admin_client, "post", "olstoy") == set(), (
+        "Убедитесь, что в режиме prefix подстрока из середины не ищется."
+    )
+    assert search(admin_client, "post", "прогулка chekhov") == {walk}
+    assert search(admin_client, "post", "прогулка tolstoy") == set()
+
+
+def test_comment_admin_search(admin_client, mixer, posts):
+    dinner, walk = posts
+    comment = mixer.blend(
+        "blog.Comment", publication=dinner, author=walk.author
+    )
+    assert search(admin_client, "comment", "обед") == {comment}, (
+        "Убедитесь, что комментарии ищутся по словам заголовка публикации."
+    )
+    assert search(admin_client, "comment", "chekhov") == {comment}
+    assert search(admin_client, "comment", "tolstoy") == set()
+
+
+def test_prefix_search_ignores_case(admin_client, mixer):
+    location = mixer.blend("blog.Location", name="McDonald's")
+    city = mixer.blend("blog.Location", name="МОСКВА")
+    assert search(admin_client, "location", "mcdon") == {location}, (
+        "Убедитесь, что в режиме prefix регистр букв в середине слова не"
+        " важен."
+    )
+    assert search(admin_client, "location", "MCDONALD") == {location}
+    assert search(admin_client, "location", "моск") == {city}
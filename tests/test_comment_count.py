@@ -0,0 +1,92 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_comment_count(post) -> int:
+    return Post.objects.values_list("comment_count", flat=True).get(
+        pk=post.pk
+    )
+
+
+def test_comment_count_follows_comments(
+    mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend(
+        "blog.Comment", publication=post, author=user
+    )
+    assert get_comment_count(post) == 3, (
+        "Убедитесь, что при создании комментария увеличивается счётчик"
+        " комментариев публикации."
+    )
+
+    comments[0].delete()
+    assert get_comment_count(post) == 2, (
+        "Убедитесь, что при удалении комментария уменьшается счётчик"
+        " комментариев публикации."
+    )
+
+    another_post = mixer.blend("blog.Post", author=user)
+    comments[1].publication = another_post
+    comments[1].save()
+    assert (get_comment_count(post), get_comment_count(another_post)) == (
+        1, 1
+    ), (
+        "Убедитесь, что при переносе комментария к другой публикации"
+        " обновляются счётчики обеих публикаций."
+    )
+
+
+def test_post_save_keeps_comment_count(
+    mixer, user, post_with_published_location
+):
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    mixer.blend("blog.Comment", publication=post, author=user)
+    post.title = "Новый заголовок"
+    post.save()
+    assert get_comment_count(post) == 1, (
+        "Убедитесь, что сохранение публикации не перезаписывает счётчик"
+        " комментариев."
+    )
+
+
+def test_post_save_after_concurrent_delete(
+    user, post_with_published_location
+):
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    Post.objects.filter(pk=post.pk).delete()
+    post.save()
+    assert Post.objects.filter(pk=post.pk).exists(), (
+        "Убедитесь, что save() публикации, удалённой в другом запросе,"
+        " снова создаёт её, как обычное сохранение Django."
+    )
+
+
+def test_comment_count_cascade(mixer, user, another_user, comment_to_a_post):
+    post = comment_to_a_post.publication
+    mixer.blend("blog.Comment", publication=post, author=another_user)
+    another_user.delete()
+    assert get_comment_count(post) == Comment.objects.filter(
+        publication=post
+    ).count() == 1, (
+        "Убедитесь, что счётчик комментариев учитывает каскадное удаление."
+    )
+
+
+def test_rebuild_comment_counts(mixer, user, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", publication=post, author=user)
+    Post.objects.update(comment_count=0)
+    stdout = io.StringIO()
+    call_command("rebuild_comment_counts", stdout=stdout)
+    assert "Пересчитано публикаций: 1" in stdout.getvalue()
+    assert get_comment_count(post) == 2, (
+        "Убедитесь, что команда `rebuild_comment_counts` пересчитывает"
+        " счётчики комментариев."
+    )
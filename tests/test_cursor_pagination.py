@@ -0,0 +1,150 @@
+import datetime
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@override_settings(BLOG_CURSOR_PAGINATION=True)
+def test_cursor_pages_follow_each_other(
+    user_client, many_posts_with_published_locations
+):
+    posts = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: (post.pub_date, post.pk),
+        reverse=True,
+    )
+
+    first_page = user_client.get("/").context["page_obj"]
+    assert list(first_page) == posts[:N_PER_PAGE], (
+        "Убедитесь, что первая страница курсорной пагинации содержит самые"
+        " новые публикации."
+    )
+    assert first_page.has_next() and not first_page.has_previous()
+
+    second_page = user_client.get(
+        "/", {"after": first_page.next_cursor}
+    ).context["page_obj"]
+    assert list(second_page) == posts[N_PER_PAGE:N_PER_PAGE * 2], (
+        "Убедитесь, что по курсору `after` отдаются публикации, идущие сразу"
+        " после предыдущей страницы."
+    )
+    assert not second_page.has_next() and second_page.has_previous()
+
+    back_page = user_client.get(
+        "/", {"before": second_page.previous_cursor}
+    ).context["page_obj"]
+    assert list(back_page) == posts[:N_PER_PAGE], (
+        "Убедитесь, что по курсору `before` отдаётся предыдущая страница."
+    )
+
+
+def test_cursor_in_url_enables_cursor_mode(
+    user_client, many_posts_with_published_locations
+):
+    response = user_client.get("/", {"after": "", "page": 2})
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        "Убедитесь, что при неверном курсоре возвращается статус 404."
+    )
+
+    content = user_client.get("/").content.decode("utf-8")
+    assert "?page=2" in content
+    with override_settings(BLOG_CURSOR_PAGINATION=True):
+        content = user_client.get("/").content.decode("utf-8")
+    assert "?after=" in content and "?page=" not in content, (
+        "Убедитесь, что в режиме курсорной пагинации шаблон пагинатора"
+        " выводит ссылки с курсором."
+    )
+
+
+def test_cursor_keeps_microseconds(mixer, user, published_category):
+    from blog.models import Post
+    from blog.paginators import CursorPaginator
+
+    now = timezone.now().replace(microsecond=0)
+    posts = [
+        mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            pub_date=now + datetime.timedelta(microseconds=number),
+        )
+        for number in range(4)
+    ][::-1]
+    paginator = CursorPaginator(Post.objects.all(), 2)
+    first = paginator.page()
+    second = paginator.page(after=first.next_cursor)
+    assert list(second) == posts[2:], (
+        "Убедитесь, что курсор хранит время публикации с микросекундами и"
+        " не пропускает публикации из той же миллисекунды."
+    )
+    assert list(paginator.page(before=second.previous_cursor)) == posts[:2]
+
+
+def test_comments_load_more(
+    mixer, monkeypatch, user, user_client, post_with_published_location
+):
+    from blog.mixins import CommentPageMixin
+
+    monkeypatch.setattr(CommentPageMixin, "comments_per_page", 2)
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend(
+        "blog.Comment", publication=post, author=user
+    )
+
+    response = user_client.get(f"/posts/{post.id}/")
+    page = response.context["comments"]
+    assert list(page) == comments[:2], (
+        "Убедитесь, что на странице публикации выводится первая страница"
+        " комментариев."
+    )
+    assert page.has_next()
+    content = response.content.decode("utf-8")
+    more_url = f"/posts/{post.id}/comments/more/?after={page.next_cursor}"
+    assert f'data-load-more="{more_url}"' in content, (
+        "Убедитесь, что под комментариями есть ссылка «Показать ещё»."
+    )
+    assert "<script>" not in content and "blog/js/load_more.js" in content, (
+        "Убедитесь, что скрипт догрузки подключается статическим файлом."
+    )
+    full_url = f"/posts/{post.id}/?comments_after={page.next_cursor}"
+    assert f'href="{full_url}#comments"' in content
+    response = user_client.get(full_url)
+    assert list(response.context["comments"]) == comments[2:], (
+        "Убедитесь, что без JavaScript ссылка «Показать ещё» открывает"
+        " страницу публикации со следующими комментариями."
+    )
+
+    response = user_client.get(more_url)
+    assert list(response.context["comments"]) == comments[2:], (
+        "Убедитесь, что по ссылке «Показать ещё» отдаются следующие"
+        " комментарии."
+    )
+    assert "<html" not in response.content.decode("utf-8")
+
+    response = user_client.get(f"/posts/{post.id}/comments/more/")
+    assert list(response.context["comments"]) == comments[:2], (
+        "Убедитесь, что без курсора догрузка отдаёт первую страницу"
+        " комментариев."
+    )
+
+
+@pytest.mark.parametrize("payload", [
+    "[{}, 1]", "[[], 1]", '{"a": 1}', "[1]", "[null, 1]",
+    '["2022-12-18T23:06:18Z", 100000000000000000000000000000]', "1",
+])
+def test_crafted_cursor_is_rejected(user_client, payload):
+    import base64
+
+    cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+    with override_settings(BLOG_CURSOR_PAGINATION=True):
+        response = user_client.get("/", {"after": cursor})
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        "Убедитесь, что курсор с неверными значениями даёт статус 404,"
+        " а не ошибку сервера."
+    )
+    response = user_client.get("/search/", {"q": "море", "after": cursor})
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def hidden_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", is_published=False, author=user,
+        category=published_category,
+    )
+
+
+def test_export_access(client, user_client, admin_client):
+    assert client.get("/posts/export/").status_code == HTTPStatus.FORBIDDEN
+    assert user_client.get("/posts/export/").status_code == (
+        HTTPStatus.FORBIDDEN
+    ), "Убедитесь, что выгрузка публикаций доступна только персоналу."
+    response = admin_client.get("/posts/export/", {"format": "xml"})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_export_jsonl(
+    admin_client, mixer, user, post_with_published_location, hidden_post
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", publication=post, author=user)
+
+    response = admin_client.get("/posts/export/")
+    assert response.status_code == HTTPStatus.OK
+    assert response.streaming, (
+        "Убедитесь, что выгрузка публикаций отдаётся потоком."
+    )
+    rows = [
+        json.loads(line)
+        for line in b"".join(response.streaming_content).splitlines()
+    ]
+    assert [row["id"] for row in rows] == [post.pk], (
+        "Убедитесь, что выгружаются только опубликованные публикации."
+    )
+    assert rows[0]["author"] == user.username
+    assert rows[0]["category"] == post.category.slug
+    assert rows[0]["location"] == post.location.name
+    assert rows[0]["comment_count"] == 2
+
+
+def test_export_posts_command_csv(post_with_published_location, tmp_path):
+    post = post_with_published_location
+    output = tmp_path / "posts.csv"
+    call_command("export_posts", format="csv", output=str(output),
+                 chunk_size=1)
+    rows = list(csv.DictReader(output.open(encoding="utf-8")))
+    assert [row["id"] for row in rows] == [str(post.pk)], (
+        "Убедитесь, что команда `export_posts` выгружает публикации в CSV."
+    )
+    assert rows[0]["title"] == post.title
+
+    stdout = io.StringIO()
+    call_command("export_posts", stdout=stdout)
+    assert json.loads(stdout.getvalue())["id"] == post.pk
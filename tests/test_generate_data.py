@@ -0,0 +1,48 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post, User
+from blog.scheduler import reconcile_visibility
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_generate_blog_data():
+    stdout = io.StringIO()
+    call_command(
+        "generate_blog_data", posts=300, users=20, categories=10,
+        locations=5, deferred_share=0.2, seed=1, stdout=stdout,
+    )
+    assert "Создано: пользователей 20, категорий 10" in stdout.getvalue()
+    assert Post.objects.count() == 300
+    assert (User.objects.count(), Category.objects.count(),
+            Location.objects.count()) == (20, 10, 5)
+    assert Comment.objects.exists()
+
+    assert reconcile_visibility() == (0, 0), (
+        "Убедитесь, что `generate_blog_data` сразу заполняет флаг видимости"
+        " публикаций."
+    )
+    assert Post.objects.filter(is_visible=False).exists()
+    assert not Post.objects.annotate(total=Count("comments")).exclude(
+        comment_count=F("total")
+    ).exists(), (
+        "Убедитесь, что `generate_blog_data` заполняет счётчики комментариев."
+    )
+    post = Post.objects.first()
+    assert post.excerpt and post.word_count and post.text_html, (
+        "Убедитесь, что у созданных публикаций заполнены производные поля."
+    )
+    assert post.image == "" and post.created_at <= timezone.now()
+    assert Post.objects.filter(pub_date__gt=timezone.now()).exists(), (
+        "Убедитесь, что даты публикаций сохраняются с учётом часового пояса."
+    )
+
+    call_command("generate_blog_data", posts=10, seed=2, stdout=io.StringIO())
+    assert Post.objects.count() == 310, (
+        "Убедитесь, что повторный запуск команды дополняет данные."
+    )
@@ -0,0 +1,71 @@
+from typing import Optional
+
+import pytest
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import RequestFactory
+
+from blog.views import CategoryDetailView, PostListView, ProfileDetailView
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_query_plan(qs: QuerySet) -> str:
+    sql, params = qs.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+
+def get_view_queryset(view_cls, user, **kwargs) -> QuerySet:
+    request = RequestFactory().get("/")
+    request.user = user
+    view = view_cls()
+    view.setup(request, **kwargs)
+    return view.get_queryset()
+
+
+def assert_index_used(qs: QuerySet, index_name: str, page: Optional[str]):
+    if connection.vendor != "sqlite":
+        pytest.skip("EXPLAIN QUERY PLAN поддерживается только в SQLite.")
+    plan = get_query_plan(qs)
+    assert index_name in plan, (
+        f"Убедитесь, что запрос {page} использует индекс `{index_name}`. "
+        f"План запроса:\n{plan}"
+    )
+    assert "TEMP B-TREE" not in plan, (
+        f"Убедитесь, что запрос {page} не сортирует строки во временном"
+        f" индексе. План запроса:\n{plan}"
+    )
+
+
+def test_index_page_uses_index(user):
+    qs = get_view_queryset(PostListView, user)
+    assert_index_used(
+        qs, "post_published_pub_date_idx", "главной страницы"
+    )
+
+
+def test_category_page_uses_index(user, published_category):
+    qs = get_view_queryset(
+        CategoryDetailView, user, category_slug=published_category.slug
+    )
+    assert_index_used(
+        qs, "post_published_category_idx", "страницы категории"
+    )
+
+
+def test_profile_page_uses_index(user, another_user):
+    qs = get_view_queryset(
+        ProfileDetailView, another_user, username=user.username
+    )
+    assert_index_used(
+        qs, "post_author_pub_date_idx", "страницы пользователя"
+    )
+
+
+def test_own_profile_page_uses_index(user):
+    qs = get_view_queryset(ProfileDetailView, user, username=user.username)
+    assert_index_used(
+        qs, "post_author_pub_date_idx", "страницы своего профиля"
+    )
@@ -0,0 +1,106 @@
+import json
+import subprocess
+import sys
+from http import HTTPStatus
+
+import pytest
+
+from core.metrics import registry
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(settings, tmp_path):
+    settings.METRICS_DIR = tmp_path
+    settings.INTERNAL_IPS = []
+    registry.reset()
+    yield tmp_path
+    registry.reset()
+
+
+def test_metrics_access(client, user_client, admin_client):
+    assert client.get("/metrics/").status_code == HTTPStatus.FORBIDDEN
+    assert user_client.get("/metrics/").status_code == HTTPStatus.FORBIDDEN, (
+        "Убедитесь, что метрики недоступны обычным пользователям."
+    )
+    response = admin_client.get("/metrics/")
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что метрики доступны персоналу."
+    )
+    assert response["Content-Type"].startswith("text/plain")
+
+
+def test_metrics_internal_ip(client, settings):
+    settings.INTERNAL_IPS = ["127.0.0.1"]
+    assert client.get("/metrics/").status_code == HTTPStatus.OK, (
+        "Убедитесь, что метрики доступны адресам из INTERNAL_IPS."
+    )
+
+
+def test_metrics_content(
+    client, admin_client, many_posts_with_published_locations
+):
+    client.get("/")
+    client.get("/", {"page": 2})
+    client.get("/posts/0/")
+    content = admin_client.get("/metrics/").content.decode("utf-8")
+    for line in (
+        'blogicum_http_request_seconds_count{view="blog:index",'
+        'status="200"} 2',
+        'blogicum_http_request_seconds_count{view="blog:post_detail",'
+        'status="404"} 1',
+        'blogicum_view_queries_count{view="blog:index"} 2',
+        'blogicum_paginator_page_bucket{view="blog:index",le="1"} 1',
+        'blogicum_paginator_page_bucket{view="blog:index",le="2"} 2',
+        'blogicum_cache_hit_ratio{cache="post_count"} 0.5',
+    ):
+        assert line in content, (
+            f"Убедитесь, что эндпоинт метрик выводит строку `{line}`."
+        )
+
+
+def test_metrics_aggregate_processes(admin_client, metrics_dir):
+    other_process = {
+        "histograms": [],
+        "counters": [{
+            "name": "cache_requests_total",
+            "labels": [["cache", "post_count"], ["result", "hit"]],
+            "value": 5,
+        }],
+    }
+    (metrics_dir / "1-0.json").write_text(json.dumps(other_process))
+    registry.inc(
+        "cache_requests_total", (("cache", "post_count"), ("result", "hit"))
+    )
+    content = admin_client.get("/metrics/").content.decode("utf-8")
+    assert (
+        'blogicum_cache_requests_total{cache="post_count",result="hit"} 6'
+        in content
+    ), "Убедитесь, что метрики складываются по всем процессам хоста."
+
+
+def test_metrics_compact_dead_processes(admin_client, metrics_dir):
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    dead_file = metrics_dir / f"{process.pid}-0.json"
+    dead_file.write_text(json.dumps({
+        "histograms": [],
+        "counters": [{
+            "name": "cache_requests_total",
+            "labels": [["cache", "post_count"], ["result", "miss"]],
+            "value": 3,
+        }],
+    }))
+    line = 'blogicum_cache_requests_total{cache="post_count",result="miss"} 3'
+    for _ in range(2):
+        content = admin_client.get("/metrics/").content.decode("utf-8")
+        assert line in content, (
+            "Убедитесь, что метрики завершившихся процессов остаются в"
+            " сумме и учитываются один раз."
+        )
+    assert not dead_file.exists(), (
+        "Убедитесь, что файл завершившегося процесса удаляется после"
+        " переноса в общий файл."
+    )
+    assert (metrics_dir / "aggregate.json").exists()
@@ -0,0 +1,196 @@
+import os
+import subprocess
+import sys
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import paginators
+from blog.scheduler import publish_due_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_count_queries(client, url, **params) -> tuple:
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, params)
+    return response, [
+        query["sql"] for query in ctx.captured_queries
+        if "COUNT(" in query["sql"].upper()
+    ]
+
+
+def test_count_is_cached(user_client, many_posts_with_published_locations):
+    _, count_queries = get_count_queries(user_client, "/")
+    assert len(count_queries) == 1
+    response, count_queries = get_count_queries(user_client, "/")
+    assert not count_queries, (
+        "Убедитесь, что число публикаций для пагинатора берётся из кеша."
+    )
+    assert response.context["page_obj"].paginator.num_pages == 2
+
+
+def test_count_cache_reset_on_post_save(
+    mixer, user, user_client, many_posts_with_published_locations
+):
+    get_count_queries(user_client, "/")
+    post = many_posts_with_published_locations[0]
+    post.is_published = False
+    post.save()
+    response, count_queries = get_count_queries(user_client, "/")
+    assert count_queries, (
+        "Убедитесь, что кеш числа публикаций сбрасывается при изменении"
+        " публикации."
+    )
+    assert response.context["page_obj"].paginator.count == len(
+        many_posts_with_published_locations
+    ) - 1
+
+
+def test_count_cache_kept_on_comment_and_profile_save(
+    mixer, user, user_client, many_posts_with_published_locations
+):
+    get_count_queries(user_client, "/")
+    mixer.blend(
+        "blog.Comment", publication=many_posts_with_published_locations[0],
+        author=user,
+    )
+    user.first_name = "Антон"
+    user.save()
+    _, count_queries = get_count_queries(user_client, "/")
+    assert not count_queries, (
+        "Убедитесь, что комментарии и правка профиля не сбрасывают кеш"
+        " числа публикаций."
+    )
+
+
+def test_generation_is_shared_between_processes():
+    from blog.cache import POSTS, get_generations
+
+    before = get_generations((POSTS,))
+    subprocess.run(
+        [sys.executable, "-c", "import django; django.setup(); from"
+         " blog.cache import bump_generation; bump_generation()"],
+        cwd=settings.BASE_DIR, check=True,
+        env={**os.environ, "DJANGO_SETTINGS_MODULE": "blogicum.settings"},
+    )
+    assert get_generations((POSTS,)) != before, (
+        "Убедитесь, что кеш общий для процессов сервера: сброс поколения"
+        " в одном процессе должен быть виден в остальных."
+    )
+
+
+def test_deep_page_without_cached_count(
+    user_client, many_posts_with_published_locations
+):
+    response, count_queries = get_count_queries(user_client, "/", page=2)
+    assert not count_queries, (
+        "Убедитесь, что при отсутствии числа публикаций в кеше глубокие"
+        " страницы отдаются без запроса COUNT."
+    )
+    page_obj = response.context["page_obj"]
+    assert page_obj.has_previous() and not page_obj.has_next()
+    assert "Последняя" not in response.content.decode("utf-8")
+
+    response, count_queries = get_count_queries(user_client, "/")
+    assert not count_queries, (
+        "Убедитесь, что число публикаций, найденное при выборке последней"
+        " страницы, сохраняется в кеш."
+    )
+
+
+def test_page_range_is_elided():
+    from django.core.paginator import Paginator
+    from django.template.loader import render_to_string
+
+    from blog.paginators import get_page_range
+
+    page = Paginator(range(200_000), 10).page(10_000)
+    html = render_to_string(
+        "includes/paginator.html",
+        {"page_obj": page, "page_range": get_page_range(page)},
+    )
+    assert html.count("<li") < 20, (
+        "Убедитесь, что пагинатор выводит сокращённый список страниц, а не"
+        " ссылку на каждую страницу."
+    )
+    assert "?page=20000" in html and "?page=10001" in html
+
+
+@override_settings(BLOG_LIST_CACHE_GRANULARITY=60)
+def test_list_rows_cached_until_next_due(
+    client, mixer, user, published_category, published_location
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location,
+    )
+    client.get("/")
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get("/")
+    assert list(response.context["page_obj"]) == [post]
+    assert not any(
+        'FROM "blog_post"' in query["sql"] for query in ctx.captured_queries
+    ), "Убедитесь, что повторный запрос ленты отдаётся из кеша."
+
+    deferred = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location,
+        pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    with mock.patch.object(
+        paginators.cache, "set", wraps=paginators.cache.set
+    ) as cache_set:
+        client.get("/")
+    timeouts = [
+        call.args[2] for call in cache_set.call_args_list
+        if ":rows:" in call.args[0]
+    ]
+    assert timeouts and max(timeouts) <= 30, (
+        "Убедитесь, что кеш ленты истекает не позже ближайшей отложенной"
+        " публикации."
+    )
+
+    with mock.patch(
+        "django.utils.timezone.now",
+        return_value=deferred.pub_date + timedelta(seconds=1),
+    ):
+        with CaptureQueriesContext(connection) as ctx:
+            client.get("/")
+        assert not any(
+            query["sql"].startswith("UPDATE")
+            for query in ctx.captured_queries
+        ), "Убедитесь, что запрос ленты ничего не пишет в базу."
+        publish_due_posts()
+        response = client.get("/")
+    assert deferred in list(response.context["page_obj"]), (
+        "Убедитесь, что открытая планировщиком публикация сразу появляется"
+        " в ленте."
+    )
+
+
+@override_settings(BLOG_LIST_CACHE_GRANULARITY=60)
+def test_list_rows_follow_comments(
+    client, mixer, user, published_category, published_location
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location,
+    )
+    client.get("/")
+    mixer.blend("blog.Comment", publication=post, author=user)
+    response = client.get("/")
+    assert response.context["page_obj"][0].comment_count == 1, (
+        "Убедитесь, что новый комментарий сбрасывает кеш строк ленты."
+    )
+
+    user.first_name = "Антон"
+    user.save()
+    response = client.get("/")
+    assert response.context["page_obj"][0].author.first_name == "Антон"
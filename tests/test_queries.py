@@ -0,0 +1,169 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_detail_anonymous_queries(
+    client, django_assert_num_queries, comment_to_a_post
+):
+    post = comment_to_a_post.publication
+    with django_assert_num_queries(2):
+        response = client.get(f"/posts/{post.id}/")
+    assert response.status_code == 200
+    assert post.location.name in response.content.decode("utf-8"), (
+        "Убедитесь, что на странице публикации выводится её местоположение."
+    )
+
+
+def test_post_detail_author_queries(
+    user_client, django_assert_num_queries, comment_to_a_post
+):
+    post = comment_to_a_post.publication
+    post.is_published = False
+    post.save()
+    # Сессия, пользователь, публикация со связями, комментарии.
+    with django_assert_num_queries(4):
+        response = user_client.get(f"/posts/{post.id}/")
+    assert response.status_code == 200, (
+        "Убедитесь, что автор видит свою снятую с публикации запись."
+    )
+
+
+def test_post_detail_hidden_from_others(
+    another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    response = another_user_client.get(f"/posts/{post.id}/")
+    assert response.status_code == 404, (
+        "Убедитесь, что снятая с публикации запись недоступна другим"
+        " пользователям."
+    )
+
+
+def count_table_queries(captured_queries, table: str) -> int:
+    return sum(
+        f'FROM "{table}"' in query["sql"] for query in captured_queries
+    )
+
+
+def test_post_edit_fetches_post_once(
+    user_client, post_with_published_location
+):
+    post = post_with_published_location
+    for url in (f"/posts/{post.id}/edit/", f"/posts/{post.id}/delete/"):
+        with CaptureQueriesContext(connection) as ctx:
+            response = user_client.get(url)
+        assert response.status_code == 200
+        assert count_table_queries(ctx.captured_queries, "blog_post") == 1, (
+            f"Убедитесь, что страница `{url}` загружает публикацию одним"
+            " запросом."
+        )
+
+
+def test_comment_edit_fetches_comment_once(mixer, user, user_client):
+    comment = mixer.blend("blog.Comment", author=user)
+    post_id = comment.publication_id
+    for url in (
+        f"/posts/{post_id}/comments/{comment.id}/edit_comment/",
+        f"/posts/{post_id}/comment/{comment.id}/delete_comment/",
+    ):
+        with CaptureQueriesContext(connection) as ctx:
+            response = user_client.get(url)
+        assert response.status_code == 200
+        queries = ctx.captured_queries
+        assert count_table_queries(queries, "blog_comment") == 1, (
+            f"Убедитесь, что страница `{url}` загружает комментарий одним"
+            " запросом."
+        )
+        assert count_table_queries(queries, "blog_post") == 0
+
+    response = user_client.get(
+        f"/posts/{post_id + 1}/comments/{comment.id}/edit_comment/"
+    )
+    assert response.status_code == 404, (
+        "Убедитесь, что комментарий не открывается по адресу чужого поста."
+    )
+
+
+def test_profile_queries(
+    client, django_assert_num_queries, many_posts_with_published_locations
+):
+    author = many_posts_with_published_locations[0].author
+    # Автор с числом публикаций и страница публикаций.
+    with django_assert_num_queries(2):
+        response = client.get(f"/profile/{author.username}/")
+    assert response.status_code == 200
+    profile = response.context["profile"]
+    assert profile.post_total == len(many_posts_with_published_locations), (
+        "Убедитесь, что в профиле выводится число публикаций автора."
+    )
+    assert response.context["page_obj"].paginator.num_pages == 2
+
+
+def test_comment_create_fragment(
+    another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/comments/?fragment=1"
+    with CaptureQueriesContext(connection) as ctx:
+        response = another_user_client.post(url, {"text": "Фрагмент"})
+    assert response.status_code == 201, (
+        "Убедитесь, что по запросу фрагмента возвращается статус 201."
+    )
+    content = response.content.decode("utf-8")
+    assert "Фрагмент" in content and "<html" not in content, (
+        "Убедитесь, что во фрагменте возвращается только новый комментарий."
+    )
+    post_selects = [
+        query["sql"] for query in ctx.captured_queries
+        if query["sql"].startswith("SELECT")
+        and 'FROM "blog_post"' in query["sql"]
+    ]
+    assert len(post_selects) == 1 and "LIMIT 1" in post_selects[0], (
+        "Убедитесь, что существование поста проверяется одним лёгким"
+        " запросом без загрузки всей публикации."
+    )
+
+    post.is_published = False
+    post.save()
+    response = another_user_client.post(url, {"text": "Скрытый"})
+    assert response.status_code == 404, (
+        "Убедитесь, что нельзя комментировать скрытую публикацию."
+    )
+
+
+def test_list_pages_skip_post_text(
+    client, mixer, user, published_category, published_location
+):
+    from django.template.defaultfilters import truncatewords
+
+    text = " ".join(f"слово{i}" for i in range(50))
+    post = mixer.blend(
+        "blog.Post", author=user, text=text, category=published_category,
+        location=published_location,
+    )
+    assert post.excerpt == truncatewords(text, 10), (
+        "Убедитесь, что анонс публикации совпадает с началом её текста."
+    )
+    assert post.word_count == 50
+
+    for url in ("/", f"/category/{published_category.slug}/",
+                f"/profile/{user.username}/"):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        content = response.content.decode("utf-8")
+        assert post.excerpt in content and "слово20" not in content
+        post_queries = [
+            query["sql"] for query in ctx.captured_queries
+            if 'FROM "blog_post"' in query["sql"]
+        ]
+        assert post_queries and all(
+            '"blog_post"."text"' not in sql for sql in post_queries
+        ), (
+            f"Убедитесь, что страница `{url}` не загружает полный текст"
+            " публикаций."
+        )
@@ -0,0 +1,50 @@
+import logging
+
+import pytest
+
+from core.metrics import registry
+from core.middleware import QueryBudgetExceeded
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    registry.reset()
+    yield
+    registry.reset()
+
+
+def test_view_metrics_recorded(client, post_with_published_location):
+    client.get("/")
+    client.get(f"/posts/{post_with_published_location.id}/")
+    labels = (("view", "blog:index"),)
+    queries = registry.get("view_queries", labels)
+    assert queries is not None and queries.count == 1, (
+        "Убедитесь, что для каждого view записывается число SQL-запросов."
+    )
+    assert queries.sum > 0
+    for name in (
+        "view_sql_seconds", "view_template_seconds", "view_wall_seconds"
+    ):
+        histogram = registry.get(name, labels)
+        assert histogram is not None and histogram.sum > 0, (
+            f"Убедитесь, что записывается метрика `{name}`."
+        )
+    assert registry.get(
+        "view_queries", (("view", "blog:post_detail"),)
+    ).count == 1
+
+
+def test_query_budget_exceeded(client, settings, caplog):
+    settings.QUERY_BUDGETS = {"blog:index": 0}
+    with pytest.raises(QueryBudgetExceeded):
+        client.get("/")
+
+    settings.QUERY_BUDGET_STRICT = False
+    with caplog.at_level(logging.WARNING, logger="core.middleware"):
+        response = client.get("/")
+    assert response.status_code == 200
+    assert "blog:index" in caplog.text, (
+        "Убедитесь, что превышение бюджета запросов записывается в лог."
+    )
@@ -0,0 +1,83 @@
+import io
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post
+from blog.scheduler import (next_due_date, publish_due_posts,
+                            reconcile_visibility)
+
+pytestmark = [pytest.mark.django_db]
+
+
+def is_visible(post) -> bool:
+    return Post.objects.values_list("is_visible", flat=True).get(pk=post.pk)
+
+
+def test_post_save_sets_visibility(post_with_published_location):
+    post = post_with_published_location
+    assert is_visible(post)
+    post.pub_date = timezone.now() + timedelta(days=1)
+    post.save()
+    assert not is_visible(post), (
+        "Убедитесь, что отложенная публикация не видна до наступления"
+        " своего времени."
+    )
+
+
+def test_scheduler_publishes_due_posts(post_with_published_location):
+    post = post_with_published_location
+    post.pub_date = timezone.now() + timedelta(hours=1)
+    post.save()
+    assert next_due_date() == post.pub_date, (
+        "Убедитесь, что планировщик знает время ближайшей отложенной"
+        " публикации."
+    )
+    assert publish_due_posts() == 0
+    assert publish_due_posts(now=post.pub_date) == 1
+    assert is_visible(post), (
+        "Убедитесь, что планировщик открывает публикации, время которых"
+        " наступило."
+    )
+    assert next_due_date() is None
+
+
+def test_category_unpublish_updates_posts(
+    client, post_with_published_location
+):
+    post = post_with_published_location
+    category = post.category
+    category.is_published = False
+    category.save()
+    assert not is_visible(post), (
+        "Убедитесь, что при снятии категории с публикации её публикации"
+        " скрываются."
+    )
+    assert client.get(f"/posts/{post.id}/").status_code == 404
+
+    category.is_published = True
+    category.save()
+    assert is_visible(post)
+
+    category.delete()
+    assert not is_visible(post), (
+        "Убедитесь, что публикации удалённой категории скрываются."
+    )
+
+
+def test_reconcile_visibility(post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(is_published=False)
+    assert reconcile_visibility() == (0, 1)
+    assert not is_visible(post)
+
+    Post.objects.filter(pk=post.pk).update(is_published=True)
+    stdout = io.StringIO()
+    call_command("publish_scheduled_posts", "--reconcile", stdout=stdout)
+    assert "исправлен: открыто 1" in stdout.getvalue()
+    assert is_visible(post), (
+        "Убедитесь, что команда `publish_scheduled_posts --reconcile`"
+        " исправляет флаг видимости."
+    )
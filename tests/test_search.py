@@ -0,0 +1,105 @@
+import io
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make(title, text, **kwargs):
+        kwargs.setdefault("is_published", True)
+        return mixer.blend(
+            "blog.Post", title=title, text=text, author=user,
+            category=published_category, **kwargs
+        )
+    return make
+
+
+def search(client, query, **params):
+    response = client.get("/search/", {"q": query, **params})
+    assert response.status_code == HTTPStatus.OK
+    return response.context["page_obj"]
+
+
+def test_search_ranks_and_highlights(client, make_post):
+    in_title = make_post("Кофе и горы", "Поднялись к перевалу.")
+    in_text = make_post("Заметка", "Утром мы пили кофе <b>на веранде</b>.")
+    make_post("Кофе", "Черновик", is_published=False)
+
+    page = search(client, "кофе")
+    assert list(page) == [in_title, in_text], (
+        "Убедитесь, что поиск находит только видимые публикации и ставит"
+        " совпадения в заголовке выше совпадений в тексте."
+    )
+    assert page[0].search_title == "<mark>Кофе</mark> и горы"
+    assert "пили <mark>кофе</mark> &lt;b&gt;" in page[1].search_snippet, (
+        "Убедитесь, что фрагмент текста подсвечивает совпадения и"
+        " экранирует HTML публикации."
+    )
+    content = client.get("/search/", {"q": "кофе"}).content.decode("utf-8")
+    assert "<mark>Кофе</mark>" in content
+
+
+def test_search_index_follows_changes(client, make_post):
+    post = make_post("Поезд", "Едем на юг.")
+    assert list(search(client, "поезд юг")) == [post]
+    assert list(search(client, "поезд север")) == [], (
+        "Убедитесь, что поиск находит публикации со всеми словами запроса."
+    )
+
+    post.text = "Летим самолётом."
+    post.save()
+    assert list(search(client, "самолётом")) == [post], (
+        "Убедитесь, что после изменения публикации поисковый индекс"
+        " обновляется."
+    )
+    post.delete()
+    assert list(search(client, "самолётом")) == []
+
+
+def test_search_pagination(client, monkeypatch, make_post):
+    from blog.views import SearchView
+
+    monkeypatch.setattr(SearchView, "paginate_by", 2)
+    in_title = [make_post(f"Море {number}", "Шторм") for number in range(3)]
+    in_text = [make_post("Шторм", f"Море {number}") for number in range(2)]
+
+    first = search(client, "море")
+    second = search(client, "море", after=first.next_cursor)
+    third = search(client, "море", after=second.next_cursor)
+    found = [*first, *second, *third]
+    assert found == in_title[::-1] + in_text[::-1], (
+        "Убедитесь, что курсорная пагинация поиска проходит все результаты"
+        " без повторов: сначала совпадения в заголовке, внутри — по"
+        " убыванию id."
+    )
+    assert not third.has_next()
+    back = search(client, "море", before=second.previous_cursor)
+    assert list(back) == list(first)
+    response = client.get("/search/", {"q": "море", "after": "!"})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    content = client.get("/search/", {"q": "море"}).content.decode("utf-8")
+    assert f"?q=%D0%BC%D0%BE%D1%80%D0%B5&after={first.next_cursor}" in (
+        content
+    ), (
+        "Убедитесь, что ссылки пагинатора поиска сохраняют запрос."
+    )
+
+
+def test_rebuild_search_index(client, make_post):
+    post = make_post("Снег", "Выпал первый снег.")
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM blog_post_search")
+        cursor.execute("DELETE FROM blog_post_search_title")
+    assert list(search(client, "снег")) == []
+    out = io.StringIO()
+    call_command("rebuild_search_index", stdout=out)
+    assert "Поисковый индекс перестроен." in out.getvalue()
+    assert list(search(client, "снег")) == [post], (
+        "Убедитесь, что команда `rebuild_search_index` заново индексирует"
+        " публикации."
+    )
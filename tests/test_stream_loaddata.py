@@ -0,0 +1,97 @@
+import io
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from blog.models import Comment, Post, User
+
+pytestmark = [pytest.mark.django_db]
+
+CREATED_AT = "2022-12-18T23:06:18.993Z"
+
+
+def make_dump():
+    return [
+        {"model": "blog.post", "pk": 5, "fields": {
+            "created_at": CREATED_AT, "is_published": True,
+            "title": "Обед", "text": "Обед у В. А. Морозовой.\nБыли все.",
+            "pub_date": "1897-02-13T00:00:00Z", "author": 3,
+            "category": 4, "location": None,
+        }},
+        {"model": "blog.comment", "pk": 1, "fields": {
+            "text": "Хорошо\nсказано", "publication": 5, "author": 3,
+            "created_at": CREATED_AT,
+        }},
+        {"model": "auth.user", "pk": 3, "fields": {
+            "username": "leo", "password": "!", "groups": [1],
+        }},
+        {"model": "auth.group", "pk": 1, "fields": {
+            "name": "Авторы", "permissions": [],
+        }},
+        {"model": "blog.category", "pk": 4, "fields": {
+            "title": "Дневник", "description": "Записи", "slug": "diary",
+            "is_published": True, "created_at": CREATED_AT,
+        }},
+    ]
+
+
+def test_iter_json_array_reads_in_chunks():
+    from blog.management.commands.stream_loaddata import iter_json_array
+
+    dump = make_dump()
+    stream = io.StringIO(json.dumps(dump, indent=2, ensure_ascii=False))
+    assert list(iter_json_array(stream, chunk_size=7)) == dump, (
+        "Убедитесь, что записи выгрузки читаются по частям без потерь."
+    )
+
+
+def test_stream_loaddata(tmp_path):
+    fixture = tmp_path / "dump.json"
+    fixture.write_text(json.dumps(make_dump(), ensure_ascii=False))
+    for _ in range(2):
+        call_command(
+            "stream_loaddata", str(fixture), batch_size=1,
+            chunk_size=2, stdout=io.StringIO(),
+        )
+
+    post = Post.objects.get()
+    assert post.pk == 5 and post.created_at.microsecond == 993000, (
+        "Убедитесь, что `stream_loaddata` сохраняет ключи и даты из выгрузки."
+    )
+    assert post.is_visible and post.comment_count == 1, (
+        "Убедитесь, что после загрузки пересчитываются видимость публикаций"
+        " и счётчики комментариев."
+    )
+    assert post.excerpt and post.text_html and Comment.objects.get().text_html
+    assert list(User.objects.get().groups.values_list("pk", flat=True)) == [1]
+
+
+def test_stream_loaddata_rolls_back_on_bad_reference(tmp_path):
+    dump = make_dump()
+    dump[1]["fields"]["publication"] = 404
+    fixture = tmp_path / "dump.json"
+    fixture.write_text(json.dumps(dump, ensure_ascii=False))
+    with pytest.raises(CommandError, match="нарушает ограничения"):
+        call_command(
+            "stream_loaddata", str(fixture), chunk_size=2,
+            stdout=io.StringIO(),
+        )
+    assert not Post.objects.exists() and not User.objects.exists(), (
+        "Убедитесь, что при ошибке `stream_loaddata` не оставляет в базе"
+        " часть выгрузки."
+    )
+
+
+def test_raw_upsert_signature():
+    import inspect
+
+    from django.db.models import QuerySet
+
+    parameters = inspect.signature(QuerySet._insert).parameters
+    assert {"raw", "on_conflict", "update_fields", "unique_fields"} <= set(
+        parameters
+    ), (
+        "Убедитесь, что приватный QuerySet._insert, на который опирается"
+        " core.db.raw_upsert, не изменился в новой версии Django."
+    )
@@ -0,0 +1,68 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+from blog.constants import TEXT_RENDERER_VERSION
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+TEXT = "<b>Жирный</b>\nвторая строка"
+TEXT_HTML = "&lt;b&gt;Жирный&lt;/b&gt;<br>вторая строка"
+
+
+def test_text_html_rendered_on_save(
+    mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    post.text = TEXT
+    post.save()
+    comment = mixer.blend(
+        "blog.Comment", publication=post, author=user, text=TEXT
+    )
+    for obj in (Post.objects.get(pk=post.pk),
+                Comment.objects.get(pk=comment.pk)):
+        assert obj.text_html == TEXT_HTML, (
+            "Убедитесь, что при сохранении текст отрисовывается в HTML"
+            " с экранированием и переносами строк."
+        )
+        assert obj.text_html_version == TEXT_RENDERER_VERSION
+
+
+def test_detail_uses_stored_html(
+    client, mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.blend("blog.Comment", publication=post, author=user)
+    Post.objects.filter(pk=post.pk).update(text_html="<p>готовый пост</p>")
+    Comment.objects.update(text_html="<p>готовый комментарий</p>")
+    content = client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    assert "<p>готовый пост</p>" in content, (
+        "Убедитесь, что страница публикации выводит сохранённый HTML текста."
+    )
+    assert "<p>готовый комментарий</p>" in content, (
+        "Убедитесь, что комментарии выводятся из сохранённого HTML."
+    )
+
+
+def test_stale_text_html(mixer, user, post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(
+        text=TEXT, text_html="устаревший", text_html_version=0
+    )
+    post.refresh_from_db()
+    assert post.body_html == TEXT_HTML, (
+        "Убедитесь, что HTML устаревшей версии отрисовывается заново."
+    )
+
+    stdout = io.StringIO()
+    call_command("rebuild_text_html", stdout=stdout)
+    assert "Публикации: обновлено 1" in stdout.getvalue()
+    post.refresh_from_db()
+    assert (post.text_html, post.text_html_version) == (
+        TEXT_HTML, TEXT_RENDERER_VERSION
+    ), (
+        "Убедитесь, что команда `rebuild_text_html` обновляет устаревший"
+        " HTML."
+    )